@@ -9,6 +9,7 @@ have been removed to align with the "real BLS data only" requirement.
 """
 
 import logging
+from bisect import bisect_right
 
 # Attempt to import the core data provider module
 try:
@@ -22,20 +23,17 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Lower bounds of each level after "Low"; matches bls_job_mapper's category logic
+RISK_LEVEL_THRESHOLDS = (30, 50, 70)
+RISK_LEVEL_LABELS = ("Low", "Moderate", "High", "Very High")
+
 def _calculate_risk_level_text(risk_percentage: float | None) -> str:
     """
     Converts a risk percentage to a textual description (Low, Moderate, High, Very High).
     """
     if risk_percentage is None:
         return "Unknown"
-    if risk_percentage < 30:
-        return "Low"
-    elif risk_percentage < 50: # Matches bls_job_mapper's category logic
-        return "Moderate"
-    elif risk_percentage < 70: # Matches bls_job_mapper's category logic
-        return "High"
-    else:
-        return "Very High"
+    return RISK_LEVEL_LABELS[bisect_right(RISK_LEVEL_THRESHOLDS, risk_percentage)]
 
 def get_job_displacement_risk(job_title: str) -> dict:
     """
@@ -52,6 +50,12 @@ def get_job_displacement_risk(job_title: str) -> dict:
     """
     logger.info(f"Getting displacement risk for '{job_title}' via bls_job_mapper.")
 
+    # A blank title can't match the static map and would otherwise go to the BLS occupation search
+    if not isinstance(job_title, str) or not job_title.strip():
+        error_msg = "No job title provided."
+        logger.warning(error_msg)
+        return {"error": error_msg, "job_title": job_title}
+
     if not MODULE_IMPORT_SUCCESS or not hasattr(bls_job_mapper, 'get_complete_job_data'):
         error_msg = "Internal error: bls_job_mapper module is not available or not correctly loaded."
         logger.error(error_msg)
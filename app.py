@@ -147,6 +147,30 @@ def admin_login_form():
     
     st.info("💡 Admin access is required to view database management tools.")
 
+# --- Risk Gauge ---
+@st.cache_resource(show_spinner=False, max_entries=128)
+def create_risk_gauge(gauge_value: float) -> go.Figure:
+    """Build the 5-year risk gauge, cached per value across reruns and sessions."""
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number", value = gauge_value,
+        domain = {'x': [0, 1], 'y': [0, 1]}, title = {'text': ""},
+        number = {'suffix': '%', 'font': {'size': 28}},
+        gauge = {
+            'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
+            'bar': {'color': "#0084FF"}, 'bgcolor': "white",
+            'borderwidth': 2, 'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 25], 'color': "rgba(0, 255, 0, 0.5)"},
+                {'range': [25, 50], 'color': "rgba(255, 255, 0, 0.5)"},
+                {'range': [50, 75], 'color': "rgba(255, 165, 0, 0.5)"},
+                {'range': [75, 100], 'color': "rgba(255, 0, 0, 0.5)"}
+            ],
+            'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': gauge_value}
+        }
+    ))
+    fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+    return fig
+
 # --- Enhanced Auto-Import Manager ---
 import threading
 import time
@@ -731,24 +755,7 @@ with tabs[0]:
                 
                 gauge_value = year_5_risk if year_5_risk is not None else 60.0
                 
-                fig = go.Figure(go.Indicator(
-                    mode = "gauge+number", value = gauge_value,
-                    domain = {'x': [0, 1], 'y': [0, 1]}, title = {'text': ""},
-                    number = {'suffix': '%', 'font': {'size': 28}},
-                    gauge = {
-                        'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                        'bar': {'color': "#0084FF"}, 'bgcolor': "white",
-                        'borderwidth': 2, 'bordercolor': "gray",
-                        'steps': [
-                            {'range': [0, 25], 'color': "rgba(0, 255, 0, 0.5)"},
-                            {'range': [25, 50], 'color': "rgba(255, 255, 0, 0.5)"},
-                            {'range': [50, 75], 'color': "rgba(255, 165, 0, 0.5)"},
-                            {'range': [75, 100], 'color': "rgba(255, 0, 0, 0.5)"}
-                        ],
-                        'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': gauge_value}
-                    }
-                ))
-                fig.update_layout(height=250, margin=dict(l=20, r=20, t=30, b=20))
+                fig = create_risk_gauge(gauge_value)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 col1_risk, col2_risk = st.columns(2)
@@ -897,22 +904,25 @@ with tabs[1]:
         with st.spinner("Fetching comparison data..."):
             comparison_job_data = simple_comparison.get_job_comparison_data(st.session_state.compare_jobs_list)
         
-        if comparison_job_data and not all("error" in data for data in comparison_job_data.values()):
+        # Filter and extract the shared columns once for all four visualizations;
+        # no extracted jobs means every comparison entry was an error.
+        comparison_columns = simple_comparison.extract_comparison_columns(comparison_job_data)
+        if comparison_columns.keys:
             comp_tabs = st.tabs(["Comparison Chart", "Detailed Table", "Risk Heatmap", "Radar Analysis"])
             with comp_tabs[0]:
-                chart = simple_comparison.create_comparison_chart(comparison_job_data)
+                chart = simple_comparison.create_comparison_chart(comparison_columns)
                 if chart: st.plotly_chart(chart, use_container_width=True)
                 else: st.info("Not enough data to create comparison chart.")
             with comp_tabs[1]:
-                df_comp = simple_comparison.create_comparison_table(comparison_job_data)
+                df_comp = simple_comparison.create_comparison_table(comparison_columns)
                 if df_comp is not None: st.dataframe(df_comp, use_container_width=True)
                 else: st.info("Not enough data to create comparison table.")
             with comp_tabs[2]:
-                heatmap = simple_comparison.create_risk_heatmap(comparison_job_data)
+                heatmap = simple_comparison.create_risk_heatmap(comparison_columns)
                 if heatmap: st.plotly_chart(heatmap, use_container_width=True)
                 else: st.info("Not enough data to create heatmap.")
             with comp_tabs[3]:
-                radar = simple_comparison.create_radar_chart(comparison_job_data)
+                radar = simple_comparison.create_radar_chart(comparison_columns)
                 if radar: st.plotly_chart(radar, use_container_width=True)
                 else: st.info("Not enough data to create radar chart.")
         else:
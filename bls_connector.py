@@ -6,11 +6,14 @@ It strictly uses real BLS data and does not fall back to sample/fictional data.
 """
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 import logging
 import datetime
-from typing import Dict, List, Any, Optional, Union
+import random
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Tuple, Union
 
 import streamlit as st # For caching, assuming it's run in a Streamlit context
 
@@ -29,8 +32,16 @@ if not logger.hasHandlers(): # Avoid duplicate handlers if re-run in some enviro
 BLS_API_BASE_URL = 'https://api.bls.gov/publicAPI/v2/timeseries/data/'
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 5  # seconds
+MAX_RETRY_DELAY = 60  # seconds; upper bound for the jittered backoff
+# (connect, read) timeouts in seconds; a stalled connect fails fast instead of using the whole read budget
+BLS_REQUEST_TIMEOUT = (5, 30)
+BLS_CHECK_TIMEOUT = (5, 10)
 MAX_SERIES_PER_REQUEST = 50 # BLS API v2 limit
 
+# One pooled session for all BLS calls, so repeated and concurrent requests reuse TCP/TLS connections
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
 # --- Helper Function to Get API Key ---
 def _get_api_key() -> Optional[str]:
     """Retrieves the BLS API key from environment variables or Streamlit secrets."""
@@ -116,7 +127,7 @@ def get_bls_data(series_ids: List[str], start_year: str, end_year: str, api_key_
 
         for attempt in range(MAX_RETRIES):
             try:
-                response = requests.post(BLS_API_BASE_URL, json=payload, timeout=30) # Increased timeout
+                response = _http_session.post(BLS_API_BASE_URL, json=payload, timeout=BLS_REQUEST_TIMEOUT)
                 response.raise_for_status()  
                 
                 data_for_chunk = response.json()
@@ -151,8 +162,9 @@ def get_bls_data(series_ids: List[str], start_year: str, end_year: str, api_key_
                 logger.error(f"RequestException on attempt {attempt + 1} for chunk {chunk_idx+1}: {e}")
             
             if attempt < MAX_RETRIES - 1:
-                delay = INITIAL_RETRY_DELAY * (2 ** attempt) 
-                logger.info(f"Retrying chunk {chunk_idx+1} in {delay} seconds...")
+                # Full jitter: concurrent callers that failed together don't retry in lockstep
+                delay = random.uniform(0, min(MAX_RETRY_DELAY, INITIAL_RETRY_DELAY * (2 ** attempt)))
+                logger.info(f"Retrying chunk {chunk_idx+1} in {delay:.1f} seconds...")
                 time.sleep(delay)
             elif data_for_chunk is None or data_for_chunk.get("status") != "REQUEST_SUCCEEDED":
                 logger.error(f"Failed to fetch BLS data for chunk {chunk_idx+1} after {MAX_RETRIES} attempts.")
@@ -167,6 +179,20 @@ def get_bls_data(series_ids: List[str], start_year: str, end_year: str, api_key_
         
     return all_results_data
 
+def select_series_from_response(bls_response: Dict[str, Any], series_ids: List[str]) -> Dict[str, Any]:
+    """
+    Return a copy of a get_bls_data response that keeps only the given series.
+
+    Lets callers fetch series for several programs (e.g. OES and EP) in one request
+    and still hand each parser a response containing only its own series.
+    """
+    wanted = set(series_ids)
+    selected = {key: value for key, value in bls_response.items() if key != "Results"}
+    selected["Results"] = {
+        "series": [series for series in bls_response.get("Results", {}).get("series", []) if series.get("seriesID") in wanted]
+    }
+    return selected
+
 # --- OES Data Functions ---
 def build_oes_series_id(soc_code: str) -> Dict[str, str]:
     """
@@ -252,7 +278,7 @@ def parse_oes_series_response(oes_response: Dict[str, Any], soc_code: str) -> Di
             if msg not in parsed_data["messages"]: parsed_data["messages"].append(msg)
             continue
 
-        latest_data_point = sorted(valid_data_points, key=lambda x: x["year"], reverse=True)[0]
+        latest_data_point = max(valid_data_points, key=itemgetter("year"))  # Latest year; the first such point on ties
         value_str = latest_data_point.get("value")
         year_str = latest_data_point.get("year")
         
@@ -542,48 +568,58 @@ def get_employment_projection(occ_code: str) -> Dict[str, Any]:
 
 
 # --- Utility Functions ---
+# Sample SOC codes and titles (abbreviated list) used by search_occupations.
+# This list should be populated from a more comprehensive source in a real application.
+_PLACEHOLDER_SOC_CODES: List[Dict[str, str]] = [
+    {"code": "11-1011", "title": "Chief Executives"},
+    {"code": "11-2011", "title": "Advertising and Promotions Managers"},
+    {"code": "11-3021", "title": "Computer and Information Systems Managers"},
+    {"code": "11-3031", "title": "Financial Managers"},
+    {"code": "13-1111", "title": "Management Analysts"},
+    {"code": "13-2011", "title": "Accountants and Auditors"},
+    {"code": "15-1211", "title": "Computer Systems Analysts"},
+    {"code": "15-1251", "title": "Computer Programmers"},
+    {"code": "15-1252", "title": "Software Developers"},
+    {"code": "15-1254", "title": "Web Developers"},
+    {"code": "15-2051", "title": "Data Scientists"},
+    {"code": "17-2071", "title": "Electrical Engineers"},
+    {"code": "23-1011", "title": "Lawyers"},
+    {"code": "25-2021", "title": "Elementary School Teachers, Except Special Education"},
+    {"code": "25-2031", "title": "Secondary School Teachers, Except Special and Career/Technical Education"},
+    {"code": "27-1024", "title": "Graphic Designers"},
+    {"code": "29-1021", "title": "Dentists, General"},
+    {"code": "29-1141", "title": "Registered Nurses"},
+    {"code": "29-1215", "title": "Family Medicine Physicians"},
+    {"code": "35-2014", "title": "Cooks, Restaurant"},
+    {"code": "41-2031", "title": "Retail Salespersons"},
+    {"code": "43-4051", "title": "Customer Service Representatives"},
+    {"code": "43-6011", "title": "Executive Secretaries and Executive Administrative Assistants"},
+    {"code": "47-2031", "title": "Carpenters"},
+    {"code": "49-3023", "title": "Automotive Service Technicians and Mechanics"},
+    {"code": "53-3032", "title": "Heavy and Tractor-Trailer Truck Drivers"}
+]
+
+# Search keys are derived once here instead of lower-casing every title on each query
+_PLACEHOLDER_SOC_TITLES_LOWER: List[Tuple[str, Dict[str, str]]] = [
+    (item["title"].lower(), item) for item in _PLACEHOLDER_SOC_CODES
+]
+_PLACEHOLDER_SOC_BY_DIGITS: Dict[str, Dict[str, str]] = {
+    item["code"].replace("-", ""): item for item in _PLACEHOLDER_SOC_CODES
+}
+
 def search_occupations(query: str) -> List[Dict[str, str]]:
     """
     Search for occupation codes matching the query.
     NOTE: This is a placeholder. A real implementation would query a comprehensive SOC database or BLS API.
     """
     logger.info(f"Searching occupations for query: '{query}' (using placeholder list)")
-    # Sample SOC codes and titles (abbreviated list)
-    # This list should be populated from a more comprehensive source in a real application
-    soc_codes = [
-        {"code": "11-1011", "title": "Chief Executives"},
-        {"code": "11-2011", "title": "Advertising and Promotions Managers"},
-        {"code": "11-3021", "title": "Computer and Information Systems Managers"},
-        {"code": "11-3031", "title": "Financial Managers"},
-        {"code": "13-1111", "title": "Management Analysts"},
-        {"code": "13-2011", "title": "Accountants and Auditors"},
-        {"code": "15-1211", "title": "Computer Systems Analysts"},
-        {"code": "15-1251", "title": "Computer Programmers"},
-        {"code": "15-1252", "title": "Software Developers"},
-        {"code": "15-1254", "title": "Web Developers"},
-        {"code": "15-2051", "title": "Data Scientists"},
-        {"code": "17-2071", "title": "Electrical Engineers"},
-        {"code": "23-1011", "title": "Lawyers"},
-        {"code": "25-2021", "title": "Elementary School Teachers, Except Special Education"},
-        {"code": "25-2031", "title": "Secondary School Teachers, Except Special and Career/Technical Education"},
-        {"code": "27-1024", "title": "Graphic Designers"},
-        {"code": "29-1021", "title": "Dentists, General"},
-        {"code": "29-1141", "title": "Registered Nurses"},
-        {"code": "29-1215", "title": "Family Medicine Physicians"},
-        {"code": "35-2014", "title": "Cooks, Restaurant"},
-        {"code": "41-2031", "title": "Retail Salespersons"},
-        {"code": "43-4051", "title": "Customer Service Representatives"},
-        {"code": "43-6011", "title": "Executive Secretaries and Executive Administrative Assistants"},
-        {"code": "47-2031", "title": "Carpenters"},
-        {"code": "49-3023", "title": "Automotive Service Technicians and Mechanics"},
-        {"code": "53-3032", "title": "Heavy and Tractor-Trailer Truck Drivers"}
-    ]
-    
     query_lower = query.lower()
-    matches = [item for item in soc_codes if query_lower in item["title"].lower()]
+    # Copies, so callers never modify the shared placeholder entries
+    matches = [dict(item) for title_lower, item in _PLACEHOLDER_SOC_TITLES_LOWER if query_lower in title_lower]
     
     if not matches: # If no title match, try matching SOC code directly
-        matches = [item for item in soc_codes if query_lower == item["code"].replace("-","")]
+        code_match = _PLACEHOLDER_SOC_BY_DIGITS.get(query_lower)
+        matches = [dict(code_match)] if code_match else []
     
     logger.info(f"Found {len(matches)} placeholder matches for query '{query}'.")
     return matches
@@ -627,7 +663,7 @@ def check_api_connectivity() -> bool:
     logger.info(f"Checking BLS API key validity with test series {test_series_id}...")
     try:
         # Use a short timeout for this check
-        response = requests.post(
+        response = _http_session.post(
             BLS_API_BASE_URL,
             json={
                 "seriesid": [test_series_id],
@@ -635,7 +671,7 @@ def check_api_connectivity() -> bool:
                 "endyear": current_year,
                 "registrationkey": api_key
             },
-            timeout=10 
+            timeout=BLS_CHECK_TIMEOUT
         )
         data = response.json()
         if data.get("status") == "REQUEST_SUCCEEDED":
@@ -9,11 +9,14 @@ It strictly avoids using any fictional or synthetic fallback data.
 
 import os
 import json
+from bisect import bisect_right
 import datetime
+import functools
 import logging
 import time
 import random
-from typing import Dict, Any, List, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Set, Tuple, Union
 import threading
 
 import pandas as pd
@@ -28,6 +31,7 @@ from sqlalchemy import (
     MetaData,
     Text,          # <- added import for SQLAlchemy Text type
     inspect,
+    select,
 )
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
@@ -109,7 +113,8 @@ engine: Optional[sqlalchemy.engine.Engine] = database.engine
 
 
 # --- Static Mappings & Helper Functions ---
-JOB_TITLE_TO_SOC: Dict[str, str] = {
+# Read-only views: these tables are shared by every session and must never be mutated.
+JOB_TITLE_TO_SOC: Mapping[str, str] = MappingProxyType({
     "software developer": "15-1252", "software engineer": "15-1252", "programmer": "15-1251",
     "web developer": "15-1254", "registered nurse": "29-1141", "nurse": "29-1141",
     "teacher": "25-2021", "elementary school teacher": "25-2021", "high school teacher": "25-2031",
@@ -135,9 +140,9 @@ JOB_TITLE_TO_SOC: Dict[str, str] = {
     "secondary school teachers, except special and career/technical education": "25-2031",
     # Added business teachers postsecondary
     "business teachers, postsecondary": "25-1011"
-}
+})
 
-SOC_TO_CATEGORY_STATIC: Dict[str, str] = {
+SOC_TO_CATEGORY_STATIC: Mapping[str, str] = MappingProxyType({
     "11-": "Management Occupations", "13-": "Business and Financial Operations Occupations",
     "15-": "Computer and Mathematical Occupations", "17-": "Architecture and Engineering Occupations",
     "19-": "Life, Physical, and Social Science Occupations", "21-": "Community and Social Service Occupations",
@@ -150,7 +155,7 @@ SOC_TO_CATEGORY_STATIC: Dict[str, str] = {
     "45-": "Farming, Fishing, and Forestry Occupations", "47-": "Construction and Extraction Occupations",
     "49-": "Installation, Maintenance, and Repair Occupations", "51-": "Production Occupations",
     "53-": "Transportation and Material Moving Occupations"
-}
+})
 
 # ------------------------------------------------------------------
 # Use the comprehensive list from soc_codes.py for batch operations.
@@ -163,20 +168,24 @@ TARGET_SOC_CODES: List[Tuple[str, str]] = _FULL_SOC_LIST
 def get_job_category(occupation_code: str) -> str:
     """Get the job category based on SOC code prefix."""
     if not isinstance(occupation_code, str): return "General"
-    for prefix, category in SOC_TO_CATEGORY_STATIC.items():
-        if occupation_code.startswith(prefix):
-            return category
-    return "General"
+    # Every key is a 3-character major-group prefix ("11-"), so a slice is a direct lookup
+    return SOC_TO_CATEGORY_STATIC.get(occupation_code[:3], "General")
+
+# Trailing words dropped by standardize_job_title (levels and seniority qualifiers)
+TITLE_SUFFIX_WORDS = frozenset({"i", "ii", "iii", "iv", "v", "specialist", "assistant", "associate", "senior", "junior", "lead"})
 
 def standardize_job_title(title: str) -> str:
     """Standardize job title format for consistent mapping."""
     if not isinstance(title, str): return ""
+    return _standardize_title_text(title)
+
+@functools.lru_cache(maxsize=4096)  # Pure string transform; the same titles recur across reruns
+def _standardize_title_text(title: str) -> str:
     standardized = title.lower().strip()
-    suffixes = [" i", " ii", " iii", " iv", " v", " specialist", " assistant", " associate", " senior", " junior", " lead"]
-    for suffix in suffixes:
-        if standardized.endswith(suffix):
-            standardized = standardized[:-len(suffix)].strip()
-            break
+    # Only the last space-separated word can be a suffix, so one set lookup replaces the endswith() scan
+    head, sep, last_word = standardized.rpartition(" ")
+    if sep and last_word in TITLE_SUFFIX_WORDS:
+        standardized = head.strip()
     return standardized
 
 def find_occupation_code(job_title: str) -> Tuple[Optional[str], str, str]:
@@ -194,6 +203,9 @@ def find_occupation_code(job_title: str) -> Tuple[Optional[str], str, str]:
         
     return None, job_title, "General"
 
+# Database rows younger than this are served without calling the BLS API again
+BLS_DATA_MAX_AGE_DAYS = 90
+
 def get_bls_data_from_db(occupation_code: str) -> Optional[Dict[str, Any]]:
     """Get BLS data from database if available and fresh."""
     db_engine = get_db_engine()
@@ -208,7 +220,7 @@ def get_bls_data_from_db(occupation_code: str) -> Optional[Dict[str, Any]]:
                 last_updated_str = data.get("last_updated")
                 if last_updated_str:
                     last_updated = datetime.datetime.strptime(last_updated_str, "%Y-%m-%d").date()
-                    if (datetime.date.today() - last_updated).days < 90:
+                    if (datetime.date.today() - last_updated).days < BLS_DATA_MAX_AGE_DAYS:
                         logger.info(f"Found fresh data for SOC {occupation_code} in database.")
                         return data
                 logger.info(f"Found stale data for SOC {occupation_code} in database. Will re-fetch.")
@@ -216,6 +228,26 @@ def get_bls_data_from_db(occupation_code: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Error retrieving BLS data from database for SOC {occupation_code}: {e}", exc_info=True)
     return None
 
+def get_fresh_soc_codes(occupation_codes: List[str]) -> Set[str]:
+    """Return the subset of occupation_codes whose database rows are fresh (one query, no row payloads)."""
+    db_engine = get_db_engine()
+    if not db_engine or not occupation_codes: return set()
+    # last_updated is stored as YYYY-MM-DD, so string comparison orders by date
+    cutoff = (datetime.date.today() - datetime.timedelta(days=BLS_DATA_MAX_AGE_DAYS)).strftime("%Y-%m-%d")
+    query = select(bls_job_data_table.c.occupation_code).where(
+        bls_job_data_table.c.occupation_code.in_(occupation_codes),
+        bls_job_data_table.c.last_updated > cutoff
+    )
+    try:
+        with db_engine.connect() as conn:
+            return set(conn.execute(query).scalars())
+    except SQLAlchemyError as e:
+        logger.error(f"Error checking data freshness for {len(occupation_codes)} SOC codes: {e}", exc_info=True)
+    return set()
+
+# Columns an upsert must never overwrite on conflict
+UPSERT_KEY_COLUMNS = frozenset({"id", "occupation_code"})
+
 def save_bls_data_to_db(data: Dict[str, Any]) -> bool:
     """Save or update BLS data in the database."""
     db_engine = get_db_engine()
@@ -223,7 +255,7 @@ def save_bls_data_to_db(data: Dict[str, Any]) -> bool:
     try:
         with db_engine.connect() as conn:
             stmt = pg_insert(bls_job_data_table).values(data)
-            update_dict = {c.name: c for c in stmt.excluded if c.name not in ["id", "occupation_code"]}
+            update_dict = {c.name: c for c in stmt.excluded if c.name not in UPSERT_KEY_COLUMNS}
             stmt = stmt.on_conflict_do_update(index_elements=['occupation_code'], set_=update_dict)
             conn.execute(stmt)
             conn.commit()
@@ -233,6 +265,23 @@ def save_bls_data_to_db(data: Dict[str, Any]) -> bool:
         logger.error(f"Error saving BLS data to database for SOC {data.get('occupation_code')}: {e}", exc_info=True)
     return False
 
+def save_bls_data_batch_to_db(records: List[Dict[str, Any]]) -> bool:
+    """Save or update several BLS records in one transaction (a single executemany upsert)."""
+    db_engine = get_db_engine()
+    records = [record for record in records if record and record.get("occupation_code")]
+    if not db_engine or not records: return False
+    try:
+        with db_engine.begin() as conn:
+            stmt = pg_insert(bls_job_data_table)
+            update_dict = {c.name: c for c in stmt.excluded if c.name not in UPSERT_KEY_COLUMNS}
+            stmt = stmt.on_conflict_do_update(index_elements=['occupation_code'], set_=update_dict)
+            conn.execute(stmt, records)
+        logger.info(f"Successfully saved/updated data for {len(records)} SOC codes in the database.")
+        return True
+    except (SQLAlchemyError, IntegrityError) as e:
+        logger.error(f"Error saving BLS data batch to database ({len(records)} SOC codes): {e}", exc_info=True)
+    return False
+
 def _get_safe_year_range(years: int = 10) -> Tuple[str, str]:
     """Gets a safe year range for BLS API calls, ensuring end_year is not in the future."""
     end_year = datetime.datetime.now().year
@@ -241,17 +290,31 @@ def _get_safe_year_range(years: int = 10) -> Tuple[str, str]:
 
 def fetch_and_process_soc_data(soc_code: str, job_title: str, db_engine_instance: sqlalchemy.engine.Engine) -> Tuple[bool, str]:
     """Fetches, processes, and stores data for a single SOC code."""
+    combined_data, message = build_soc_data_record(soc_code, job_title)
+    if combined_data is None:
+        return False, message
+    
+    # Save to database
+    if not save_bls_data_to_db(combined_data):
+        return False, "Failed to save data to the database."
+        
+    return True, "Data successfully fetched and stored."
+
+def build_soc_data_record(soc_code: str, job_title: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Fetches and processes data for a single SOC code into a bls_job_data row, without saving it."""
     if not bls_connector:
-        return False, "BLS Connector module is not available."
+        return None, "BLS Connector module is not available."
     start_year, end_year = _get_safe_year_range()
     
-    # Fetch OES data (employment and wages)
+    # OES (employment and wages) and EP (projections) series go out in one request;
+    # the API takes up to 50 series per call, and each parser gets only its own series back
     oes_series = bls_connector.build_oes_series_id(soc_code)
-    oes_data_raw = bls_connector.get_bls_data([oes_series['employment'], oes_series['mean_wage']], start_year, end_year)
-    
-    # Fetch EP data (projections)
+    oes_series_ids = [oes_series['employment'], oes_series['mean_wage']]
     ep_series = bls_connector.build_ep_series_id(soc_code)
-    ep_data_raw = bls_connector.get_bls_data(list(ep_series.values()), start_year, end_year)
+    ep_series_ids = list(ep_series.values())
+    combined_data_raw = bls_connector.get_bls_data(oes_series_ids + ep_series_ids, start_year, end_year)
+    oes_data_raw = bls_connector.select_series_from_response(combined_data_raw, oes_series_ids)
+    ep_data_raw = bls_connector.select_series_from_response(combined_data_raw, ep_series_ids)
     
     # Parse data with correct helper names in bls_connector
     oes_parsed = bls_connector.parse_oes_series_response(oes_data_raw, soc_code)
@@ -259,7 +322,7 @@ def fetch_and_process_soc_data(soc_code: str, job_title: str, db_engine_instance
     
     if not oes_parsed or not ep_parsed or "error" in oes_parsed or "error" in ep_parsed:
         error_msg = f"OES Error: {oes_parsed.get('error', 'N/A')}, EP Error: {ep_parsed.get('error', 'N/A')}"
-        return False, error_msg
+        return None, error_msg
 
     # Combine data
     combined_data = {
@@ -281,12 +344,7 @@ def fetch_and_process_soc_data(soc_code: str, job_title: str, db_engine_instance
         "raw_ep_data_json": json.dumps(ep_data_raw),
         "last_api_fetch": datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d')
     }
-    
-    # Save to database
-    if not save_bls_data_to_db(combined_data):
-        return False, "Failed to save data to the database."
-        
-    return True, "Data successfully fetched and stored."
+    return combined_data, "Data successfully fetched."
 
 def generate_employment_trend(current: Optional[int], projected: Optional[int], num_years: int) -> List[int]:
     """Generate a simple linear trend for employment."""
@@ -295,46 +353,55 @@ def generate_employment_trend(current: Optional[int], projected: Optional[int],
     annual_change = (projected - current) / (num_years - 1)
     return [int(current + (annual_change * i)) for i in range(num_years)]
 
+# Category risk profiles are static; build the table once at import rather than
+# on every call.  Entries are shared, so they are exposed read-only.
+_CATEGORY_RISK_PROFILES: Dict[str, Dict[str, Any]] = {
+    "Computer and Mathematical Occupations": {"base": 35, "inc": 8, "variance": 7, "prot": ["Complex system design", "Novel algorithm development"]},
+    "Management Occupations": {"base": 20, "inc": 4, "variance": 4, "prot": ["Strategic leadership", "Complex stakeholder management"]},
+    "Business and Financial Operations Occupations": {"base": 45, "inc": 9, "variance": 6, "prot": ["Strategic financial planning", "Client advisory"]},
+    "Healthcare Practitioners and Technical Occupations": {"base": 15, "inc": 6, "variance": 5, "prot": ["Direct patient care and empathy", "Complex clinical judgment"]},
+    "Educational Instruction and Library Occupations": {"base": 20, "inc": 5, "variance": 5, "prot": ["Mentorship and social-emotional support", "Creative lesson planning"]},
+    "Legal Occupations": {"base": 30, "inc": 7, "variance": 6, "prot": ["Complex legal strategy", "Courtroom advocacy"]},
+    "Office and Administrative Support Occupations": {"base": 65, "inc": 7, "variance": 4, "prot": ["Complex office management", "Handling exceptional cases"]},
+    "Sales and Related Occupations": {"base": 55, "inc": 8, "variance": 6, "prot": ["Complex relationship-based sales", "High-value negotiation"]},
+    "Production Occupations": {"base": 70, "inc": 5, "variance": 4, "prot": ["Quality control oversight", "Machine maintenance and setup"]},
+    "Transportation and Material Moving Occupations": {"base": 60, "inc": 9, "variance": 5, "prot": ["Handling complex urban routes", "Last-mile delivery logistics"]},
+    "Default": {
+        "base": 40,
+        "inc": 6,
+        "variance": 5,
+        "prot": ["Human creativity and adaptability", "Complex interpersonal skills"]
+    }
+}
+CATEGORY_RISK_PROFILES: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {category: MappingProxyType(profile) for category, profile in _CATEGORY_RISK_PROFILES.items()}
+)
+COMMON_RISK_FACTORS: Tuple[str, ...] = ("Routine task automation", "Predictive data analysis", "Process optimization")
+ROUTINE_CODING_SOC_CODES = frozenset({"15-1252", "15-1251"})  # Software developers and programmers
+# Lower bounds (inclusive) of each risk category above "Low", by 5-year risk
+RISK_CATEGORY_THRESHOLDS: Tuple[float, ...] = (30, 50, 70)
+RISK_CATEGORY_LABELS: Tuple[str, ...] = ("Low", "Moderate", "High", "Very High")
+
 def calculate_ai_risk_from_category(job_category: str, occupation_code: str) -> Dict[str, Any]:
     """Calculate AI displacement risk based on job category and specific SOC code modifiers."""
-    profiles = {
-        "Computer and Mathematical Occupations": {"base": 35, "inc": 8, "variance": 7, "prot": ["Complex system design", "Novel algorithm development"]},
-        "Management Occupations": {"base": 20, "inc": 4, "variance": 4, "prot": ["Strategic leadership", "Complex stakeholder management"]},
-        "Business and Financial Operations Occupations": {"base": 45, "inc": 9, "variance": 6, "prot": ["Strategic financial planning", "Client advisory"]},
-        "Healthcare Practitioners and Technical Occupations": {"base": 15, "inc": 6, "variance": 5, "prot": ["Direct patient care and empathy", "Complex clinical judgment"]},
-        "Educational Instruction and Library Occupations": {"base": 20, "inc": 5, "variance": 5, "prot": ["Mentorship and social-emotional support", "Creative lesson planning"]},
-        "Legal Occupations": {"base": 30, "inc": 7, "variance": 6, "prot": ["Complex legal strategy", "Courtroom advocacy"]},
-        "Office and Administrative Support Occupations": {"base": 65, "inc": 7, "variance": 4, "prot": ["Complex office management", "Handling exceptional cases"]},
-        "Sales and Related Occupations": {"base": 55, "inc": 8, "variance": 6, "prot": ["Complex relationship-based sales", "High-value negotiation"]},
-        "Production Occupations": {"base": 70, "inc": 5, "variance": 4, "prot": ["Quality control oversight", "Machine maintenance and setup"]},
-        "Transportation and Material Moving Occupations": {"base": 60, "inc": 9, "variance": 5, "prot": ["Handling complex urban routes", "Last-mile delivery logistics"]},
-        "Default": {
-            "base": 40,
-            "inc": 6,
-            "variance": 5,
-            "prot": ["Human creativity and adaptability", "Complex interpersonal skills"]
-        }
-    }
-    profile = profiles.get(job_category, profiles["Default"])
+    profile = CATEGORY_RISK_PROFILES.get(job_category, CATEGORY_RISK_PROFILES["Default"])
+    base = profile["base"]
     
     # Adjustments for specific roles
-    if occupation_code in ["15-1252", "15-1251"]: profile["base"] += 5 # Higher risk for routine coding
-    if occupation_code == "15-2051": profile["base"] -= 10 # Lower risk for data scientists
+    if occupation_code in ROUTINE_CODING_SOC_CODES: base += 5 # Higher risk for routine coding
+    if occupation_code == "15-2051": base -= 10 # Lower risk for data scientists
     
-    year_1_risk = max(5, min(95, profile['base'] + random.uniform(-profile['variance'], profile['variance'])))
+    year_1_risk = max(5, min(95, base + random.uniform(-profile['variance'], profile['variance'])))
     year_5_risk = max(5, min(95, year_1_risk + profile['inc'] * 4 + random.uniform(-profile['variance'], profile['variance'])))
     
-    risk_category = "Low"
-    if year_5_risk >= 70: risk_category = "Very High"
-    elif year_5_risk >= 50: risk_category = "High"
-    elif year_5_risk >= 30: risk_category = "Moderate"
+    risk_category = RISK_CATEGORY_LABELS[bisect_right(RISK_CATEGORY_THRESHOLDS, year_5_risk)]
     
     return {
         "year_1_risk": round(year_1_risk, 1),
         "year_5_risk": round(year_5_risk, 1),
         "risk_category": risk_category,
-        "risk_factors": ["Routine task automation", "Predictive data analysis", "Process optimization"],
-        "protective_factors": profile["prot"]
+        "risk_factors": list(COMMON_RISK_FACTORS),
+        "protective_factors": list(profile["prot"])
     }
 
 def get_job_titles_for_autocomplete() -> List[Dict[str, str]]:
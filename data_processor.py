@@ -163,6 +163,10 @@ DEFAULT_CATEGORY = {
     ]
 }
 
+# Category patterns compiled once at import; determine_risk_factors runs all of them per title
+_CATEGORY_PATTERNS = [(category, info, re.compile(info['pattern'])) for category, info in JOB_CATEGORIES.items()]
+_LIBRARY_SPECIALIST_PATTERN = re.compile(r'librarian|media collection|specialist')
+
 def determine_risk_factors(job_title: str, data_sources: Dict[str, Any]) -> Dict[str, Any]:
     """
     Determine risk factors based on job title and category.
@@ -180,9 +184,8 @@ def determine_risk_factors(job_title: str, data_sources: Dict[str, Any]) -> Dict
     best_match_score = 0
     
     # Determine job category using regex pattern matching
-    for category, info in JOB_CATEGORIES.items():
-        pattern = info['pattern']
-        matches = re.findall(pattern, job_title_lower)
+    for category, info, pattern in _CATEGORY_PATTERNS:
+        matches = pattern.findall(job_title_lower)
         match_score = len(matches)
         
         if match_score > best_match_score:
@@ -201,7 +204,7 @@ def determine_risk_factors(job_title: str, data_sources: Dict[str, Any]) -> Dict
     additional_factors = []
     
     # Add specific factors for librarians and media specialists
-    if re.search(r'librarian|media collection|specialist', job_title_lower):
+    if _LIBRARY_SPECIALIST_PATTERN.search(job_title_lower):
         additional_factors = [
             "Digital cataloging and automated classification systems",
             "AI-powered search and information retrieval tools",
@@ -225,6 +228,10 @@ def determine_risk_factors(job_title: str, data_sources: Dict[str, Any]) -> Dict
         'protective_factors': protective_factors
     }
 
+# Lower bounds of the Moderate, High and Very High risk levels
+RISK_LEVEL_THRESHOLDS = np.array([30, 50, 75])
+RISK_LEVEL_LABELS = np.array(["Low", "Moderate", "High", "Very High"], dtype=object)
+
 def calculate_risk_levels(risk_values: List[float]) -> List[str]:
     """
     Convert numerical risk values to risk level categories.
@@ -235,19 +242,13 @@ def calculate_risk_levels(risk_values: List[float]) -> List[str]:
     Returns:
         List of risk level categories (Low, Moderate, High, Very High)
     """
-    risk_levels = []
-    
-    for risk in risk_values:
-        if risk < 30:
-            risk_levels.append("Low")
-        elif risk < 50:
-            risk_levels.append("Moderate")
-        elif risk < 75:
-            risk_levels.append("High")
-        else:
-            risk_levels.append("Very High")
-    
-    return risk_levels
+    # np.digitize buckets every value in one pass: < 30 -> 0, [30, 50) -> 1, [50, 75) -> 2, >= 75 -> 3
+    bucket_indices = np.digitize(np.asarray(risk_values, dtype=float), RISK_LEVEL_THRESHOLDS)
+    return RISK_LEVEL_LABELS[bucket_indices].tolist()
+
+# Projection horizon for process_job_data; the year factor makes later years slightly less predictable
+YEARS = np.arange(1, 6)
+YEAR_FACTORS = 1 - 0.1 * (YEARS - 1)
 
 def process_job_data(job_title: str, data_sources: Dict[str, Any] = None) -> Dict[str, Any]:
     """
@@ -273,21 +274,15 @@ def process_job_data(job_title: str, data_sources: Dict[str, Any] = None) -> Dic
     job_category = risk_info['job_category']
     
     # Calculate risk for years 1-5
-    risk_values = []
     np.random.seed(hash(job_title) % 10000)  # Consistent randomness for same job title
     
-    for year in range(1, 6):
-        # Add some randomness but ensure consistent results for same job title
-        variation = np.random.normal(0, variance)
-        
-        # Year factor makes later years slightly less predictable
-        year_factor = 1 - (0.1 * (year - 1))
-        
-        # Calculate risk with diminishing returns for later years
-        risk = min(98, base_risk + (yearly_increase * year * year_factor) + variation)
-        risk = max(2, risk)  # Ensure minimum risk of 2%
-        
-        risk_values.append(round(risk, 1))
+    # Add some randomness but ensure consistent results for same job title
+    # (one draw of 5 yields the same values as 5 successive scalar draws)
+    variations = np.random.normal(0, variance, len(YEARS))
+    
+    # Calculate risk with diminishing returns for later years, clamped to 2-98%
+    risks = np.clip(base_risk + yearly_increase * YEARS * YEAR_FACTORS + variations, 2, 98)
+    risk_values = [round(risk, 1) for risk in risks.tolist()]
     
     # Get risk level descriptions
     risk_levels = calculate_risk_levels(risk_values)
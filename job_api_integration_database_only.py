@@ -8,6 +8,10 @@ NO hardcoded job data or synthetic fallback data is used.
 import os
 import logging
 import datetime # Added for employment trend year calculation
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 
 # Use shared DB engine from the core database module
@@ -26,6 +30,22 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Each lookup maps the title, reads the database and may call the BLS API. Repeated
+# titles (single-job analysis, comparisons) reuse a successful result for this long.
+# Errors are never cached. Least-recently-used titles are evicted first.
+JOB_DATA_CACHE_TTL_SECONDS = 300
+JOB_DATA_CACHE_MAX_ENTRIES = 256
+_job_data_cache: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+_job_data_cache_lock = threading.Lock()  # Sessions and the comparison pool share the cache; guards reordering and eviction
+
+# Comparisons with more than this many uncached titles fetch them on a small thread
+# pool; each fetch is dominated by database and BLS API I/O.
+PARALLEL_FETCH_MIN_TITLES = 4
+PARALLEL_FETCH_MAX_WORKERS = 8
+
+# Longer inputs are not job titles; they are rejected before any database or BLS work
+MAX_JOB_TITLE_LENGTH = 200
+
 # ------------------------------------------------------------------
 # New helper – full data retrieval from BLS DB / API
 # This replicates the functionality that used to live in
@@ -195,6 +215,11 @@ def generate_employment_trend(current_employment: Optional[int], projected_emplo
         return {"years": [], "employment": []}
 
 
+def invalidate_job_data_cache() -> None:
+    """Drop all cached get_job_data results, e.g. after the underlying BLS rows were refreshed."""
+    with _job_data_cache_lock:
+        _job_data_cache.clear()
+
 def get_job_data(job_title: str) -> Dict[str, Any]:
     """
     Get job data ONLY from Neon database (via bls_job_mapper) or BLS API.
@@ -202,12 +227,58 @@ def get_job_data(job_title: str) -> Dict[str, Any]:
     is searched, it does not default to "project manager" unless bls_job_mapper itself
     incorrectly maps it (which would be an issue in bls_job_mapper.py).
 
+    Successful results are cached per title for JOB_DATA_CACHE_TTL_SECONDS; cached
+    dictionaries are shared between callers and must not be modified.
+
     Args:
         job_title: The job title to analyze.
 
     Returns:
         Dictionary with job data or an error message.
     """
+    cached = _get_cached_job_data(job_title)
+    if cached is not None:
+        logger.debug("Using cached job data for '%s'.", job_title)
+        return cached
+
+    data = _fetch_job_data(job_title)
+    _cache_job_data(job_title, data)
+    return data
+
+def _get_cached_job_data(job_title: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result for a title if it is still fresh, else None."""
+    with _job_data_cache_lock:
+        cached = _job_data_cache.get(job_title)
+        if cached is not None and time.monotonic() - cached[0] < JOB_DATA_CACHE_TTL_SECONDS:
+            _job_data_cache.move_to_end(job_title)
+            return cached[1]
+    return None
+
+def _cache_job_data(job_title: str, data: Dict[str, Any]) -> None:
+    """Remember a successful result; error results are not cached."""
+    if "error" in data:
+        return
+    with _job_data_cache_lock:
+        _job_data_cache[job_title] = (time.monotonic(), data)
+        _job_data_cache.move_to_end(job_title)
+        if len(_job_data_cache) > JOB_DATA_CACHE_MAX_ENTRIES:
+            _job_data_cache.popitem(last=False)  # Evict the least recently used title
+
+def _validate_job_title(job_title: str) -> Optional[str]:
+    """Return an error message if the title can't be a job title, else None."""
+    if not isinstance(job_title, str) or not job_title.strip():
+        return "Invalid job title provided (empty or not a string)."
+    if len(job_title) > MAX_JOB_TITLE_LENGTH:
+        return f"Invalid job title provided (longer than {MAX_JOB_TITLE_LENGTH} characters)."
+    return None
+
+def _fetch_job_data(job_title: str) -> Dict[str, Any]:
+    """Uncached body of get_job_data: map the title, load BLS data and format it for the app."""
+    validation_error = _validate_job_title(job_title)
+    if validation_error:
+        logger.warning(f"Rejected job title '{str(job_title)[:50]}': {validation_error}")
+        return {"error": validation_error, "job_title": str(job_title), "source": "input_error"}
+
     logger.info(f"Fetching job data for: '{job_title}' using only authentic BLS sources via bls_job_mapper.")
 
     # Ensure we have an initialised engine; this avoids each module
@@ -335,6 +406,25 @@ def get_job_data(job_title: str) -> Dict[str, Any]:
         }
 
 
+def _prefetch_job_data(job_titles: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch uncached titles concurrently when there are more than PARALLEL_FETCH_MIN_TITLES.
+
+    Workers only run _fetch_job_data; results are written to the cache afterwards on
+    the calling thread. Returns {} when the titles are few enough to fetch one by one.
+    """
+    cold_titles = [title for title in dict.fromkeys(job_titles) if _get_cached_job_data(title) is None]
+    if len(cold_titles) <= PARALLEL_FETCH_MIN_TITLES:
+        return {}
+
+    logger.info(f"Fetching {len(cold_titles)} uncached jobs in parallel.")
+    with ThreadPoolExecutor(max_workers=min(PARALLEL_FETCH_MAX_WORKERS, len(cold_titles))) as pool:
+        fetched = dict(zip(cold_titles, pool.map(_fetch_job_data, cold_titles)))
+    for title, data in fetched.items():
+        _cache_job_data(title, data)
+    return fetched
+
+
 def get_jobs_comparison_data(job_list: List[str]) -> Dict[str, Any]:
     """
     Get comparison data for multiple jobs using ONLY database/BLS data.
@@ -354,6 +444,8 @@ def get_jobs_comparison_data(job_list: List[str]) -> Dict[str, Any]:
         # Return a structure that indicates an error with the input itself
         return {"error_input": "Invalid input: job_list must be a list of strings."}
 
+    prefetched = _prefetch_job_data([title for title in job_list if isinstance(title, str) and title.strip()])
+
     for job_title in job_list:
         if not isinstance(job_title, str) or not job_title.strip():
             logger.warning(f"Skipping invalid job title in comparison list: '{job_title}'")
@@ -363,7 +455,7 @@ def get_jobs_comparison_data(job_list: List[str]) -> Dict[str, Any]:
             continue
         
         logger.debug(f"Fetching data for comparison: '{job_title}'")
-        job_data_result = get_job_data(job_title) # This now returns the formatted data or an error object
+        job_data_result = prefetched[job_title] if job_title in prefetched else get_job_data(job_title) # Formatted data or an error object
         
         # Store the result, whether it's data or an error object, under the original job title key
         results[job_title] = job_data_result
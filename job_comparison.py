@@ -5,9 +5,17 @@ This module provides the logic for comparing job data using real BLS data.
 
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
 import job_api_integration_database_only as job_api_integration
 
+COMPARISON_TABLE_COLUMNS = [
+    "Job Title",
+    "1-Year Risk (%)",
+    "5-Year Risk (%)",
+    "Current Employment",
+    "Growth Rate (%)",
+    "Median Wage",
+]
+
 def get_job_comparison_data(jobs_list):
     """
     Get comparison data for multiple jobs using ONLY database/BLS data.
@@ -41,8 +49,8 @@ def create_comparison_chart(comparison_data):
     
     # Prepare data for plotting
     jobs = list(valid_jobs.keys())
-    year_1_risks = [valid_jobs[job].get('year_1_risk', 0) or 0 for job in jobs]
-    year_5_risks = [valid_jobs[job].get('year_5_risk', 0) or 0 for job in jobs]
+    year_1_risks = [data.get('year_1_risk', 0) or 0 for data in valid_jobs.values()]
+    year_5_risks = [data.get('year_5_risk', 0) or 0 for data in valid_jobs.values()]
     
     # Ensure we have valid data
     if not jobs or all(risk == 0 for risk in year_1_risks + year_5_risks):
@@ -96,8 +104,8 @@ def create_employment_comparison(comparison_data):
         return None
     
     jobs = list(valid_jobs.keys())
-    employment = [valid_jobs[job].get('current_employment') or 0 for job in jobs]
-    growth = [valid_jobs[job].get('projected_growth') or valid_jobs[job].get('percent_change') or 0 for job in jobs]
+    employment = [data.get('current_employment') or 0 for data in valid_jobs.values()]
+    growth = [data.get('projected_growth') or data.get('percent_change') or 0 for data in valid_jobs.values()]
     
     # Create employment comparison chart
     fig = go.Figure()
@@ -155,6 +163,7 @@ def create_comparison_table(comparison_data):
     if not valid_jobs:
         return None
     
+    # Rows are plain tuples; column names are given once to the DataFrame
     df_data = []
     for job, data in valid_jobs.items():
         # Handle None values safely
@@ -162,16 +171,16 @@ def create_comparison_table(comparison_data):
         growth_rate = data.get('projected_growth') or data.get('percent_change') or 0
         wage = data.get('median_wage') or 0
         
-        df_data.append({
-            "Job Title": job,
-            "1-Year Risk (%)": data.get("year_1_risk", 0),
-            "5-Year Risk (%)": data.get("year_5_risk", 0),
-            "Current Employment": f"{current_emp:,}" if current_emp else "Data unavailable",
-            "Growth Rate (%)": f"{growth_rate:.1f}%" if growth_rate else "Data unavailable",
-            "Median Wage": f"${wage:,}" if wage else "Data unavailable"
-        })
-    
-    return pd.DataFrame(df_data)
+        df_data.append((
+            job,
+            data.get("year_1_risk", 0),
+            data.get("year_5_risk", 0),
+            f"{current_emp:,}" if current_emp else "Data unavailable",
+            f"{growth_rate:.1f}%" if growth_rate else "Data unavailable",
+            f"${wage:,}" if wage else "Data unavailable"
+        ))
+    
+    return pd.DataFrame(df_data, columns=COMPARISON_TABLE_COLUMNS)
 
 def create_risk_heatmap(comparison_data):
     """Create a risk heatmap from comparison data."""
@@ -191,8 +200,8 @@ def create_risk_heatmap(comparison_data):
         return None
     
     jobs = list(valid_jobs.keys())
-    year_1_risks = [valid_jobs[job].get("year_1_risk", 0) or 0 for job in jobs]
-    year_5_risks = [valid_jobs[job].get("year_5_risk", 0) or 0 for job in jobs]
+    year_1_risks = [data.get("year_1_risk", 0) or 0 for data in valid_jobs.values()]
+    year_5_risks = [data.get("year_5_risk", 0) or 0 for data in valid_jobs.values()]
     
     # Ensure we have valid data
     if not jobs or all(risk == 0 for risk in year_1_risks + year_5_risks):
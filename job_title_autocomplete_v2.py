@@ -7,9 +7,10 @@ It includes features for search ranking and suggestion filtering.
 """
 
 import os
+import bisect
 import streamlit as st
 from sqlalchemy import text
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import logging
 import database  # central database module exposing shared `engine`
 
@@ -78,6 +79,21 @@ def load_job_titles_from_db() -> List[Dict[str, Any]]:
         logger.error(f"Error loading job titles from database: {str(e)}", exc_info=True)
         return [] # Return empty list on error, no hardcoded fallbacks
 
+@st.cache_resource(ttl=300, show_spinner=False)  # Rebuilt whenever the title list itself expires
+def load_job_title_index() -> Tuple[List[Dict[str, Any]], List[str], List[Tuple[str, int]]]:
+    """
+    Build a search index over the autocomplete titles.
+    Shared across sessions (not copied per call), so callers must not modify the returned data.
+    
+    Returns:
+        Tuple of (jobs in database order, lowercase display title per job,
+        (lowercase display title, position) pairs sorted for prefix range lookups).
+    """
+    jobs = load_job_titles_from_db()
+    lower_titles = [job["display_title"].lower() for job in jobs]
+    sorted_titles = sorted(zip(lower_titles, range(len(jobs))))
+    return jobs, lower_titles, sorted_titles
+
 def search_job_titles(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Search for job titles matching a query string, with ranking.
@@ -89,7 +105,7 @@ def search_job_titles(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     Returns:
         List of matching job titles (dictionaries with "display_title", "soc_code").
     """
-    all_job_titles = load_job_titles_from_db()
+    all_job_titles, lower_titles, sorted_titles = load_job_title_index()
 
     if not all_job_titles:
         return [] # Database error or no titles loaded
@@ -107,29 +123,31 @@ def search_job_titles(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     # To avoid duplicates in results if a title matches multiple criteria
     added_titles = set()
 
-    for job in all_job_titles:
-        display_title_lower = job["display_title"].lower()
-        
+    # Exact and starts-with matches form one contiguous range of the sorted index;
+    # visit them in database order so ranking matches a full scan
+    first = bisect.bisect_left(sorted_titles, (query_lower,))
+    last = bisect.bisect_left(sorted_titles, (query_lower + "\U0010ffff",), lo=first)
+    for position in sorted(position for _, position in sorted_titles[first:last]):
+        display_title_lower = lower_titles[position]
         if display_title_lower in added_titles:
             continue
-
-        # Exact match on display title
         if display_title_lower == query_lower:
-            exact_matches.append(job)
-            added_titles.add(display_title_lower)
-            continue # Move to next job if exact match found
+            exact_matches.append(all_job_titles[position])
+        else:
+            starts_with_matches.append(all_job_titles[position])
+        added_titles.add(display_title_lower)
 
-        # Starts with match on display title
-        if display_title_lower.startswith(query_lower):
-            starts_with_matches.append(job)
-            added_titles.add(display_title_lower)
-            continue
-        
-        # Contains match on display title or original search terms
-        if query_lower in display_title_lower or \
-           any(query_lower in term for term in job["search_terms"] if term):
-            contains_matches.append(job)
-            added_titles.add(display_title_lower)
+    # Contains matches rank last, so only scan for them if the prefix range left room
+    if len(exact_matches) + len(starts_with_matches) < limit:
+        for job, display_title_lower in zip(all_job_titles, lower_titles):
+            if display_title_lower in added_titles:
+                continue
+
+            # Contains match on display title or original search terms
+            if query_lower in display_title_lower or \
+               any(query_lower in term for term in job["search_terms"] if term):
+                contains_matches.append(job)
+                added_titles.add(display_title_lower)
 
     # Combine results, prioritizing exact matches, then starts-with, then contains
     results = exact_matches + starts_with_matches + contains_matches
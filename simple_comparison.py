@@ -4,10 +4,17 @@ Job Comparison Module (simple_comparison.py)
 Generates visualizations and comparison tables using real BLS data
 obtained via job_api_integration_database_only.py.
 """
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+import functools
+import hashlib
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 
 # Assuming job_api_integration_database_only is in the same path or installed
 try:
@@ -24,139 +31,328 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Comparison fetches hit the database/BLS for every job, and Streamlit reruns the
+# page on each interaction. Identical job sets reuse the last fetch for this long.
+# The cache is process-wide and least-recently-used entries are evicted first.
+COMPARISON_CACHE_TTL_SECONDS = 300
+COMPARISON_CACHE_MAX_ENTRIES = 64
+_comparison_cache: "OrderedDict[frozenset, tuple[float, dict]]" = OrderedDict()
+_comparison_cache_lock = threading.Lock()  # Sessions run on separate threads; guards lookups, reordering and eviction
+
+# Figures and tables built from identical comparison data are reused instead of rebuilt on each rerun
+RENDER_CACHE_MAX_ENTRIES = 32
+_render_cache: "OrderedDict[tuple[str, str], go.Figure | pd.DataFrame]" = OrderedDict()
+_render_cache_lock = threading.Lock()  # Shared across session threads, like _comparison_cache_lock
+
+# Risk levels in severity order; the table's Risk Category column is an ordered categorical
+RISK_CATEGORY_ORDER = ("Low", "Moderate", "High", "Very High")
+
+# Static figure layouts, built once at import instead of on every render
+_CHART_LAYOUT = dict(
+    title_text='AI Displacement Risk Comparison',
+    xaxis_title_text='Job Titles',
+    yaxis_title_text='Risk Percentage (%)',
+    barmode='group',
+    legend_title_text='Risk Horizon',
+    height=450,
+    margin=dict(l=50, r=50, t=80, b=120), # Adjust bottom margin for long job titles
+    xaxis_tickangle=-45 # Angle job titles if they are long
+)
+_HEATMAP_LAYOUT = dict(
+    title_text="AI Displacement Risk Progression Heatmap",
+    xaxis_title_text="Job Titles",
+    yaxis_title_text="Risk Horizon",
+    margin=dict(l=100, r=50, t=80, b=120),
+    xaxis_tickangle=-45
+)
+_RADIAL_AXIS = dict(
+    visible=True,
+    range=[0, 100], # All scaled values are 0-100
+    tickvals=[0, 25, 50, 75, 100],
+    ticktext=['0/Low', '25', '50/Avg', '75', '100/High']
+)
+_RADAR_LAYOUT = dict(
+    polar=dict(radialaxis=_RADIAL_AXIS),
+    showlegend=True,
+    title_text="Multi-Factor Job Comparison Radar",
+    legend_title_text="Job Titles",
+    height=500,
+    margin=dict(l=80, r=80, t=100, b=80)
+)
+
+def _in_request_order(data: dict, jobs_list: list[str]) -> dict:
+    """Return `data` keyed in the order the jobs were requested."""
+    return {job: data[job] for job in jobs_list if job in data} | data
+
+def invalidate_cache() -> None:
+    """Drop all cached comparison fetches, e.g. after the underlying job data was refreshed."""
+    with _comparison_cache_lock:
+        _comparison_cache.clear()
+
 def get_job_comparison_data(jobs_list: list[str]) -> dict:
     """
     Get comparison data for multiple jobs using ONLY database/BLS data.
+
+    Results are cached per set of job titles (order and duplicates ignored) for
+    COMPARISON_CACHE_TTL_SECONDS, keeping at most COMPARISON_CACHE_MAX_ENTRIES sets.
+    Fetches where any job failed are not cached, so a transient database/BLS
+    error is retried on the next call.
     """
-    logger.info(f"Fetching comparison data for jobs: {jobs_list}")
+    cache_key = frozenset(jobs_list)
+    with _comparison_cache_lock:
+        cached = _comparison_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < COMPARISON_CACHE_TTL_SECONDS:
+            _comparison_cache.move_to_end(cache_key)
+        else:
+            cached = None
+    if cached is not None:
+        logger.info("Using cached comparison data for jobs: %s", jobs_list)
+        return _in_request_order(cached[1], jobs_list)
+
+    logger.info("Fetching comparison data for jobs: %s", jobs_list)
     try:
         data = job_api_integration.get_jobs_comparison_data(jobs_list)
-        logger.info(f"Successfully fetched comparison data for {len(jobs_list)} jobs.")
-        return data
+        logger.info("Successfully fetched comparison data for %d jobs.", len(jobs_list))
     except Exception as e:
-        logger.error(f"Error in get_job_comparison_data: {e}", exc_info=True)
+        logger.error("Error in get_job_comparison_data: %s", e, exc_info=True)
         return {job: {"error": f"Data unavailable for {job} due to system error: {e}", "job_title": job} for job in jobs_list}
 
-def create_comparison_chart(comparison_data: dict) -> go.Figure | None:
+    if data and not any(not v or "error" in v for v in data.values()):
+        with _comparison_cache_lock:
+            _comparison_cache[cache_key] = (time.monotonic(), data)
+            _comparison_cache.move_to_end(cache_key)
+            if len(_comparison_cache) > COMPARISON_CACHE_MAX_ENTRIES:
+                _comparison_cache.popitem(last=False)  # Evict the least recently used job set
+    return data
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ComparisonColumns:
     """
-    Create a comparison bar chart for 1-Year and 5-Year AI Displacement Risk.
+    Column-wise view of the valid (non-error) jobs in a comparison result.
+    Built once by extract_comparison_columns() and shared by all chart/table builders.
+    Missing risks are stored as 0; missing employment/growth/wage values as NaN.
+    Instances compare and hash by identity (the fields hold lists and arrays); compare digest for content.
+    """
+    keys: list[str]             # Original search terms (keys of the comparison dict)
+    titles: list[str]           # Standardized titles, falling back to the search term
+    soc_codes: list[str]
+    risk_categories: list[str]
+    risk_matrix: np.ndarray     # (2, N) rows of [1Y risk, 5Y risk]; year_1_risk/year_5_risk are its rows
+    year_1_risk: np.ndarray
+    year_5_risk: np.ndarray
+    current_employment: np.ndarray
+    projected_growth: np.ndarray
+    median_wage: np.ndarray
+    radar_metrics: np.ndarray   # (N, 4) rows of [1Y risk, 5Y risk, scaled growth, scaled wage], all 0-100
+    digest: str = field(init=False, repr=False, compare=False) # Stable content hash; equal data gives equal digests
+
+    def __post_init__(self):
+        # Every render keys the figure cache on the digest, so compute it up front
+        h = hashlib.blake2b(digest_size=16)
+        for values in (self.keys, self.titles, self.soc_codes, self.risk_categories):
+            h.update(repr(values).encode())
+        for array in (self.year_1_risk, self.year_5_risk, self.current_employment, self.projected_growth, self.median_wage):
+            h.update(array.tobytes())
+        object.__setattr__(self, "digest", h.hexdigest())
+
+# Numeric fields pulled from every job record, in ComparisonColumns order
+_NUMERIC_FIELDS = ('year_1_risk', 'year_5_risk', 'current_employment', 'projected_growth', 'median_wage')
+
+def extract_comparison_columns(comparison_data: dict) -> ComparisonColumns:
+    """
+    Filter out error entries and pull every field the builders need in a single pass.
+    Pass the result to the create_* functions to avoid re-filtering the raw dict per chart.
     """
+    valid_jobs_data = {k: v for k, v in (comparison_data or {}).items() if v and "error" not in v}
+    records = list(valid_jobs_data.values())
+    # One contiguous float64 row per field. Each field is coerced on its own, so a
+    # non-numeric value (None, 'N/A') becomes NaN instead of failing the whole comparison.
+    numeric = np.array([
+        pd.to_numeric(pd.Series([data.get(field) for data in records], dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        for field in _NUMERIC_FIELDS
+    ]).reshape(len(_NUMERIC_FIELDS), len(records))
+    _, _, current_employment, projected_growth, median_wage = numeric
+    # Both risk horizons share one (2, N) block; missing risks count as 0
+    risk_matrix = np.nan_to_num(numeric[:2])
+    year_1_risk, year_5_risk = risk_matrix
+
+    # Radar dimensions; missing growth/wage values count as 0.
+    # Scale growth: 0% growth -> 50. +10% growth -> 100. -10% growth -> 0.
+    # This makes "higher is better" for growth outlook on the radar.
+    # (original app_production: min(max(growth_val * 10, 0), 100) - only shows positive)
+    # New scaling: (value + 10) * 5. So -10% -> 0, 0% -> 50, +10% -> 100.
+    scaled_growth = np.clip((np.nan_to_num(projected_growth) + 10.0) * 5.0, 0.0, 100.0)
+    # Scale wage: $100k -> 100. $50k -> 50. Assuming wage is in absolute dollars.
+    # (original app_production: min(max(median_wage / 1000, 0), 100))
+    scaled_wage = np.clip(np.nan_to_num(median_wage) / 1000.0, 0.0, 100.0)
+
+    return ComparisonColumns(
+        keys=list(valid_jobs_data.keys()),
+        titles=[data.get('job_title', key) for key, data in valid_jobs_data.items()],
+        soc_codes=[data.get('occupation_code', 'N/A') for data in records],
+        risk_categories=[data.get('risk_category', 'N/A') for data in records],
+        risk_matrix=risk_matrix,
+        year_1_risk=year_1_risk,
+        year_5_risk=year_5_risk,
+        current_employment=current_employment,
+        projected_growth=projected_growth, # percent_change from API
+        median_wage=median_wage,
+        # One contiguous row per job for the radar traces
+        radar_metrics=np.column_stack([year_1_risk, year_5_risk, scaled_growth, scaled_wage]),
+    )
+
+# The last raw comparison dict passed to a builder and its extracted columns, so calling
+# several builders with the same dict filters it only once. The dict is compared by identity,
+# so it must not be mutated between builder calls.
+_last_extracted: "tuple[dict | None, ComparisonColumns | None]" = (None, None)
+
+def _as_columns(comparison_data: "dict | ComparisonColumns") -> ComparisonColumns | None:
+    """Accept either a raw comparison dict or pre-extracted columns; None if there is no data."""
+    global _last_extracted
+    if isinstance(comparison_data, ComparisonColumns):
+        return comparison_data
     if not comparison_data:
+        return None
+    last_source, last_columns = _last_extracted
+    if last_source is comparison_data:
+        return last_columns
+    columns = extract_comparison_columns(comparison_data)
+    _last_extracted = (comparison_data, columns)
+    return columns
+
+def _cached_render(build):
+    """
+    Memoize a figure/table builder on the content digest of its comparison data.
+    Cached results are shared between callers and must not be modified.
+    """
+    @functools.wraps(build)
+    def wrapper(comparison_data: "dict | ComparisonColumns"):
+        columns = _as_columns(comparison_data)
+        if columns is None:
+            return build(comparison_data)
+        cache_key = (build.__name__, columns.digest)
+        with _render_cache_lock:
+            rendered = _render_cache.get(cache_key)
+            if rendered is not None:
+                _render_cache.move_to_end(cache_key)
+                return rendered
+        rendered = build(columns)
+        if rendered is not None:
+            with _render_cache_lock:
+                _render_cache[cache_key] = rendered
+                if len(_render_cache) > RENDER_CACHE_MAX_ENTRIES:
+                    _render_cache.popitem(last=False)
+        return rendered
+    return wrapper
+
+@_cached_render
+def create_comparison_chart(comparison_data: "dict | ComparisonColumns") -> go.Figure | None:
+    """
+    Create a comparison bar chart for 1-Year and 5-Year AI Displacement Risk.
+    """
+    columns = _as_columns(comparison_data)
+    if columns is None:
         logger.warning("create_comparison_chart: No comparison data provided.")
         return None
     
-    valid_jobs_data = {k: v for k, v in comparison_data.items() if v and "error" not in v}
-    
-    if not valid_jobs_data:
+    if not columns.keys:
         logger.warning("create_comparison_chart: No valid job data found after filtering errors.")
         return None
     
-    job_titles = list(valid_jobs_data.keys())
-    year_1_risks = [valid_jobs_data[job].get('year_1_risk', 0) or 0 for job in job_titles]
-    year_5_risks = [valid_jobs_data[job].get('year_5_risk', 0) or 0 for job in job_titles]
+    job_titles = columns.keys
+    year_1_risks = columns.year_1_risk
+    year_5_risks = columns.year_5_risk
     
-    if not job_titles or (all(r == 0 for r in year_1_risks) and all(r == 0 for r in year_5_risks)):
+    if not job_titles or not (year_1_risks.any() or year_5_risks.any()):
         logger.warning("create_comparison_chart: Job titles list is empty or all risk values are zero.")
         return None
         
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        name='1-Year Risk',
-        x=job_titles,
-        y=year_1_risks,
-        marker_color='#63A4FF', # Light blue
-        text=[f"{y:.1f}%" for y in year_1_risks],
-        textposition='auto'
-    ))
-    fig.add_trace(go.Bar(
-        name='5-Year Risk', 
-        x=job_titles,
-        y=year_5_risks,
-        marker_color='#0052B8', # Dark blue
-        text=[f"{y:.1f}%" for y in year_5_risks],
-        textposition='auto'
-    ))
-    
-    fig.update_layout(
-        title_text='AI Displacement Risk Comparison',
-        xaxis_title_text='Job Titles',
-        yaxis_title_text='Risk Percentage (%)',
-        barmode='group',
-        legend_title_text='Risk Horizon',
-        height=450,
-        margin=dict(l=50, r=50, t=80, b=120), # Adjust bottom margin for long job titles
-        xaxis_tickangle=-45 # Angle job titles if they are long
+    # Both traces and the layout go through Plotly's validation in a single constructor call
+    fig = go.Figure(
+        data=[
+            go.Bar(
+                name='1-Year Risk',
+                x=job_titles,
+                y=year_1_risks,
+                marker_color='#63A4FF', # Light blue
+                text=np.char.mod("%.1f%%", year_1_risks),
+                textposition='auto'
+            ),
+            go.Bar(
+                name='5-Year Risk',
+                x=job_titles,
+                y=year_5_risks,
+                marker_color='#0052B8', # Dark blue
+                text=np.char.mod("%.1f%%", year_5_risks),
+                textposition='auto'
+            )
+        ],
+        layout=_CHART_LAYOUT
     )
     logger.info("Successfully created comparison chart.")
     return fig
 
-def create_comparison_table(comparison_data: dict) -> pd.DataFrame | None:
+@_cached_render
+def create_comparison_table(comparison_data: "dict | ComparisonColumns") -> pd.DataFrame | None:
     """
     Create a pandas DataFrame for detailed job comparison.
     """
-    if not comparison_data:
+    columns = _as_columns(comparison_data)
+    if columns is None:
         logger.warning("create_comparison_table: No comparison data provided.")
         return None
 
-    valid_jobs_data = {k: v for k, v in comparison_data.items() if v and "error" not in v}
-
-    if not valid_jobs_data:
+    if not columns.keys:
         logger.warning("create_comparison_table: No valid job data found after filtering errors.")
         return None
 
-    table_rows = []
-    for job_title_key, data in valid_jobs_data.items():
-        # job_title_key is the key from the input dict (original search term)
-        # data.get('job_title') is the standardized title from BLS
-        display_title = data.get('job_title', job_title_key) 
-        
-        current_emp = data.get('current_employment')
-        proj_growth = data.get('projected_growth') # This is percent_change from API
-        med_wage = data.get('median_wage')
-
-        table_rows.append({
-            "Job Title": display_title,
-            "SOC Code": data.get('occupation_code', 'N/A'),
-            "Risk Category": data.get('risk_category', 'N/A'),
-            "1-Year Risk (%)": f"{data.get('year_1_risk', 0):.1f}",
-            "5-Year Risk (%)": f"{data.get('year_5_risk', 0):.1f}",
-            "Current Employment": f"{int(current_emp):,}" if current_emp is not None else "N/A",
-            "Projected Growth (%)": f"{proj_growth:.1f}" if proj_growth is not None else "N/A",
-            "Median Annual Wage": f"${int(med_wage):,}" if med_wage is not None else "N/A"
-        })
-    
-    if not table_rows:
-        logger.warning("create_comparison_table: No rows generated for the table.")
-        return None
-
-    df = pd.DataFrame(table_rows)
+    # Titles are the standardized BLS titles, falling back to the original search term.
+    # Fixed-point columns are formatted array-wide; NaN marks a missing value. The
+    # thousands-separated columns need format-spec ',' which %-formatting lacks.
+    df = pd.DataFrame({
+        "Job Title": columns.titles,
+        "SOC Code": columns.soc_codes,
+        "Risk Category": columns.risk_categories,
+        "1-Year Risk (%)": np.char.mod("%.1f", columns.year_1_risk),
+        "5-Year Risk (%)": np.char.mod("%.1f", columns.year_5_risk),
+        "Current Employment": [f"{int(v):,}" if not np.isnan(v) else "N/A" for v in columns.current_employment],
+        "Projected Growth (%)": np.where(np.isnan(columns.projected_growth), "N/A", np.char.mod("%.1f", columns.projected_growth)),
+        "Median Annual Wage": [f"${int(v):,}" if not np.isnan(v) else "N/A" for v in columns.median_wage]
+    }, dtype=object) # Every column is display text; an explicit dtype skips pandas' type inference
+    # Risk Category sorts by severity; unexpected labels (e.g. 'N/A') follow the known levels.
+    # Missing values are shown as 'Unknown', since a categorical would turn them into NaN.
+    risk_categories = [c if isinstance(c, str) and c else "Unknown" for c in columns.risk_categories]
+    extra_categories = [c for c in dict.fromkeys(risk_categories) if c not in RISK_CATEGORY_ORDER]
+    df["Risk Category"] = pd.Categorical(
+        risk_categories, categories=[*RISK_CATEGORY_ORDER, *extra_categories], ordered=True
+    )
     logger.info("Successfully created comparison table DataFrame.")
     return df
 
-def create_risk_heatmap(comparison_data: dict) -> go.Figure | None:
+@_cached_render
+def create_risk_heatmap(comparison_data: "dict | ComparisonColumns") -> go.Figure | None:
     """
     Create a heatmap visualizing 1-Year and 5-Year risks for jobs.
     """
-    if not comparison_data:
+    columns = _as_columns(comparison_data)
+    if columns is None:
         logger.warning("create_risk_heatmap: No comparison data provided.")
         return None
 
-    valid_jobs_data = {k: v for k, v in comparison_data.items() if v and "error" not in v}
-
-    if not valid_jobs_data:
+    if not columns.keys:
         logger.warning("create_risk_heatmap: No valid job data found after filtering errors.")
         return None
 
-    job_titles = [valid_jobs_data[job].get('job_title', job) for job in valid_jobs_data.keys()]
-    year_1_risks = [valid_jobs_data[job].get('year_1_risk', 0) or 0 for job in valid_jobs_data.keys()]
-    year_5_risks = [valid_jobs_data[job].get('year_5_risk', 0) or 0 for job in valid_jobs_data.keys()]
+    job_titles = columns.titles
+    year_1_risks = columns.year_1_risk
+    year_5_risks = columns.year_5_risk
 
-    if not job_titles or (all(r == 0 for r in year_1_risks) and all(r == 0 for r in year_5_risks)):
+    if not job_titles or not (year_1_risks.any() or year_5_risks.any()):
         logger.warning("create_risk_heatmap: Job titles list is empty or all risk values are zero.")
         return None
         
     # Data for heatmap: rows are risk horizons, columns are jobs
-    heatmap_z_data = [year_1_risks, year_5_risks]
+    heatmap_z_data = columns.risk_matrix
     y_labels = ["1-Year Risk", "5-Year Risk"]
 
     fig = go.Figure(data=go.Heatmap(
@@ -166,112 +362,94 @@ def create_risk_heatmap(comparison_data: dict) -> go.Figure | None:
         colorscale="RdYlGn_r", # Red (high risk) to Green (low risk)
         zmin=0,
         zmax=100,
-        text=[[f"{val:.1f}%" for val in row] for row in heatmap_z_data], # Display percentages on cells
+        text=np.char.add(np.char.mod("%.1f", heatmap_z_data), "%"), # Display percentages on cells
         texttemplate="%{text}",
         showscale=True,
         colorbar={"title": "Risk (%)"}
     ))
     
-    fig.update_layout(
-        title_text="AI Displacement Risk Progression Heatmap",
-        xaxis_title_text="Job Titles",
-        yaxis_title_text="Risk Horizon",
-        height=350 + len(job_titles) * 10, # Adjust height based on number of jobs
-        margin=dict(l=100, r=50, t=80, b=120),
-        xaxis_tickangle=-45
-    )
+    fig.update_layout(**_HEATMAP_LAYOUT, height=350 + len(job_titles) * 10) # Adjust height based on number of jobs
     logger.info("Successfully created risk heatmap.")
     return fig
 
-def create_radar_chart(comparison_data: dict) -> go.Figure | None:
+@_cached_render
+def create_radar_chart(comparison_data: "dict | ComparisonColumns") -> go.Figure | None:
     """
     Create a radar chart comparing jobs across multiple dimensions.
     Dimensions: AI Risk (1Y), AI Risk (5Y), Job Growth (scaled), Median Wage (scaled).
     """
-    if not comparison_data:
+    columns = _as_columns(comparison_data)
+    if columns is None:
         logger.warning("create_radar_chart: No comparison data provided.")
         return None
 
-    valid_jobs_data = {k: v for k, v in comparison_data.items() if v and "error" not in v}
-    
-    if not valid_jobs_data:
+    if not columns.keys:
         logger.warning("create_radar_chart: No valid job data found after filtering errors.")
         return None
 
     fig = go.Figure()
     categories = ["AI Risk (1Y)", "AI Risk (5Y)", "Job Growth Outlook", "Median Wage Level"]
 
-    for job_key, data in valid_jobs_data.items():
-        display_title = data.get('job_title', job_key)
-        
-        year_1_risk = data.get('year_1_risk', 0) or 0
-        year_5_risk = data.get('year_5_risk', 0) or 0
-        
-        # projected_growth is percent_change
-        growth_val = data.get('projected_growth', 0) or 0
-        # Scale growth: 0% growth -> 50. +10% growth -> 100. -10% growth -> 0.
-        # This makes "higher is better" for growth outlook on the radar.
-        # (original app_production: min(max(growth_val * 10, 0), 100) - only shows positive)
-        # New scaling: (value + 10) * 5. So -10% -> 0, 0% -> 50, +10% -> 100.
-        scaled_growth = min(max(0, (growth_val + 10) * 5), 100)
-
-        median_wage = data.get('median_wage', 0) or 0
-        # Scale wage: $100k -> 100. $50k -> 50.
-        # (original app_production: min(max(median_wage / 1000, 0), 100))
-        scaled_wage = min(max(0, (median_wage / 1000)), 100) # Assuming wage is in absolute dollars
-
-        values = [
-            year_1_risk,    # Lower is better, but radar shows magnitude.
-            year_5_risk,    # Lower is better.
-            scaled_growth,  # Higher is better.
-            scaled_wage     # Higher is better.
-        ]
-        
+    # Each row is [1Y risk (lower is better), 5Y risk (lower is better),
+    # growth outlook (higher is better), wage level (higher is better)].
+    for display_title, values in zip(columns.titles, columns.radar_metrics):
         fig.add_trace(go.Scatterpolar(
-            r=values,
+            r=values.tolist(),
             theta=categories,
             fill='toself',
             name=display_title,
             hovertemplate='<b>%{theta}</b>: %{r:.1f}<extra></extra>' # Custom hover text
         ))
     
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100], # All scaled values are 0-100
-                tickvals=[0, 25, 50, 75, 100],
-                ticktext=['0/Low', '25', '50/Avg', '75', '100/High']
-            )
-        ),
-        showlegend=True,
-        title_text="Multi-Factor Job Comparison Radar",
-        legend_title_text="Job Titles",
-        height=500,
-        margin=dict(l=80, r=80, t=100, b=80)
-    )
+    fig.update_layout(**_RADAR_LAYOUT)
     logger.info("Successfully created radar chart.")
     return fig
 
 if __name__ == '__main__':
     # Example usage for testing this module directly
-    # This requires job_api_integration_database_only.py to be functional
-    # and environment variables (DATABASE_URL, BLS_API_KEY) to be set.
+    # Fetching requires job_api_integration_database_only.py to be functional
+    # and environment variables (DATABASE_URL, BLS_API_KEY) to be set;
+    # without BLS_API_KEY the builders are tested on stub data.
     
     logging.basicConfig(level=logging.INFO)
     logger.info("Running simple_comparison.py direct tests...")
 
     test_job_list = ["Software Developer", "Registered Nurse", "NonExistentJob123"]
     
-    logger.info(f"\n--- Test 1: get_job_comparison_data ---")
-    comp_data = get_job_comparison_data(test_job_list)
+    logger.info("\n--- Test 1: get_job_comparison_data ---")
+    if not os.environ.get('BLS_API_KEY'):
+        # No BLS key: exercise the chart/table builders on stub data instead of hitting the network.
+        logger.warning("BLS_API_KEY not set; using stub comparison data instead of fetching.")
+        # One job per RISK_CATEGORY_ORDER level, listed out of severity order, plus an error entry
+        stub_risks = {
+            "Registered Nurse": (15.0, 40.0, "Moderate"),
+            "Data Entry Clerk": (50.0, 90.0, "Very High"),
+            "Software Developer": (10.0, 25.0, "Low"),
+            "Accountant": (30.0, 60.0, "High"),
+        }
+        comp_data = {
+            job: {
+                'job_title': job,
+                'year_1_risk': year_1_risk,
+                'year_5_risk': year_5_risk,
+                'projected_growth': 5.0,
+                'median_wage': 70000,
+                'occupation_code': '15-0000',
+                'risk_category': risk_category,
+                'current_employment': 100000
+            }
+            for job, (year_1_risk, year_5_risk, risk_category) in stub_risks.items()
+        }
+        comp_data["NonExistentJob123"] = {"error": "No BLS data found for 'NonExistentJob123' (stub).", "job_title": "NonExistentJob123"}
+    else:
+        comp_data = get_job_comparison_data(test_job_list)
     if comp_data:
-        logger.info(f"Comparison data fetched for {len(comp_data)} jobs (includes potential errors).")
+        logger.info("Comparison data fetched for %d jobs (includes potential errors).", len(comp_data))
         for job, details in comp_data.items():
             if "error" in details:
-                logger.warning(f"  {job}: Error - {details['error']}")
+                logger.warning("  %s: Error - %s", job, details['error'])
             else:
-                logger.info(f"  {job}: Success - Year 5 Risk: {details.get('year_5_risk')}")
+                logger.info("  %s: Success - Year 5 Risk: %s", job, details.get('year_5_risk'))
     else:
         logger.error("Failed to fetch any comparison data.")
 
@@ -279,7 +457,7 @@ if __name__ == '__main__':
     valid_comp_data = {k: v for k, v in comp_data.items() if v and "error" not in v}
 
     if valid_comp_data:
-        logger.info(f"\n--- Test 2: create_comparison_chart ---")
+        logger.info("\n--- Test 2: create_comparison_chart ---")
         chart_fig = create_comparison_chart(valid_comp_data)
         if chart_fig:
             logger.info("Comparison chart figure created successfully.")
@@ -287,15 +465,15 @@ if __name__ == '__main__':
         else:
             logger.error("Failed to create comparison chart figure.")
 
-        logger.info(f"\n--- Test 3: create_comparison_table ---")
+        logger.info("\n--- Test 3: create_comparison_table ---")
         table_df = create_comparison_table(valid_comp_data)
         if table_df is not None and not table_df.empty:
-            logger.info("Comparison table DataFrame created successfully:")
-            logger.info(f"\n{table_df.to_string()}")
+            logger.info("Comparison table DataFrame created successfully (sorted by Risk Category):")
+            logger.info("\n%s", table_df.sort_values("Risk Category").to_string())
         else:
             logger.error("Failed to create comparison table DataFrame or it was empty.")
 
-        logger.info(f"\n--- Test 4: create_risk_heatmap ---")
+        logger.info("\n--- Test 4: create_risk_heatmap ---")
         heatmap_fig = create_risk_heatmap(valid_comp_data)
         if heatmap_fig:
             logger.info("Risk heatmap figure created successfully.")
@@ -303,7 +481,7 @@ if __name__ == '__main__':
         else:
             logger.error("Failed to create risk heatmap figure.")
 
-        logger.info(f"\n--- Test 5: create_radar_chart ---")
+        logger.info("\n--- Test 5: create_radar_chart ---")
         radar_fig = create_radar_chart(valid_comp_data)
         if radar_fig:
             logger.info("Radar chart figure created successfully.")
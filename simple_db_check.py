@@ -38,24 +38,32 @@ def run_simple_db_check():
         with engine.connect() as conn:
             print("\n[SUCCESS] Database connection successful.")
 
-            # 1. Total count of occupations
-            print("\n--- Checking Total Occupation Count ---")
+            soc_to_find = "13-1082"
+            # All checks run as scalar subqueries of one statement: one network round-trip
+            # to Neon instead of five.
             try:
-                total_count_result = conn.execute(text("SELECT COUNT(*) FROM bls_job_data")).scalar_one_or_none()
-                print(f"Total Occupations Loaded: {total_count_result or 0}")
+                total_count_result, exists_result, category_count, latest_date, oldest_date = conn.execute(
+                    text("""
+                        SELECT
+                            (SELECT COUNT(*) FROM bls_job_data),
+                            (SELECT 1 FROM bls_job_data WHERE occupation_code = :soc LIMIT 1),
+                            (SELECT COUNT(DISTINCT job_category) FROM bls_job_data),
+                            (SELECT MAX(last_updated) FROM bls_job_data),
+                            (SELECT MIN(last_updated) FROM bls_job_data)
+                    """),
+                    {"soc": soc_to_find}
+                ).one()
             except Exception as e:
-                print(f"[ERROR] Could not query total count. The table 'bls_job_data' might not exist. Details: {e}")
+                print(f"[ERROR] Could not query database statistics. The table 'bls_job_data' might not exist. Details: {e}")
                 # If the table doesn't exist, no other queries will work.
                 return
 
+            # 1. Total count of occupations
+            print("\n--- Checking Total Occupation Count ---")
+            print(f"Total Occupations Loaded: {total_count_result or 0}")
+
             # 2. Specifically check for "13-1082"
             print("\n--- Checking for '13-1082: Project Management Specialists' ---")
-            soc_to_find = "13-1082"
-            exists_result = conn.execute(
-                text("SELECT EXISTS(SELECT 1 FROM bls_job_data WHERE occupation_code = :soc)"),
-                {"soc": soc_to_find}
-            ).scalar_one()
-
             if exists_result:
                 print(f"[FOUND] SOC Code '{soc_to_find}' exists in the database.")
             else:
@@ -64,15 +72,12 @@ def run_simple_db_check():
             # 3. Basic Statistics
             print("\n--- Basic Database Statistics ---")
             # Count distinct categories
-            category_count = conn.execute(text("SELECT COUNT(DISTINCT job_category) FROM bls_job_data")).scalar_one_or_none()
             print(f"Number of Unique Job Categories: {category_count or 0}")
 
             # Get the most recent entry date
-            latest_date = conn.execute(text("SELECT MAX(last_updated) FROM bls_job_data")).scalar_one_or_none()
             print(f"Most Recent Data Entry Date: {latest_date or 'N/A'}")
             
             # Get the oldest entry date
-            oldest_date = conn.execute(text("SELECT MIN(last_updated) FROM bls_job_data")).scalar_one_or_none()
             print(f"Oldest Data Entry Date: {oldest_date or 'N/A'}")
 
 
@@ -1,37 +1,50 @@
 import streamlit as st
+import asyncio
+import atexit
 import os
-import json
-import time
 import datetime
+import hashlib
+import importlib.util
+from collections import deque
+import time
 import logging
+import logging.handlers
+import queue
+import tempfile
+import threading
+import orjson
 from sqlalchemy.exc import SQLAlchemyError
 
-# Attempt to import necessary application modules
-try:
-    import bls_job_mapper # For get_complete_job_data and the list of known SOCs
-    # database.py might not be directly needed here if engine is passed,
-    # but bls_job_mapper depends on it.
-    MODULE_IMPORT_SUCCESS = True
-except ImportError as e:
-    MODULE_IMPORT_SUCCESS = False
-    # This error will be logged, and the UI function will show a message.
-    logging.basicConfig(level=logging.ERROR)
-    logging.critical(f"Simplified Admin: CRITICAL IMPORT ERROR: {e}. Admin functions disabled.")
+# bls_job_mapper (for the BLS fetch helpers and the list of known SOCs) pulls in the database setup,
+# so it is only imported once the admin tool is actually displayed; see _get_bls_job_mapper().
+MODULE_IMPORT_SUCCESS = importlib.util.find_spec("bls_job_mapper") is not None
+_bls_job_mapper = None
 
 # --- Configuration ---
 POPULATION_PROGRESS_FILE_SIMPLIFIED = "simplified_admin_population_progress.json"
 LOG_FILE_SIMPLIFIED = "simplified_admin_population_log.txt"
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024 # The log rotates at this size, keeping one older file
+MAX_CONCURRENT_SOC_FETCHES = 5 # Upper bound on SOCs fetched from BLS at the same time
+# Bump whenever the progress file layout changes, and register a migration in _PROGRESS_MIGRATIONS
+PROGRESS_SCHEMA_VERSION = 3
+# Only the newest log lines are kept for display; the full history is in LOG_FILE_SIMPLIFIED
+MAX_DISPLAYED_LOG_LINES = 500
+# Completed batches are checkpointed once this many SOCs or seconds have accumulated;
+# pause, reset and completion always save immediately
+CHECKPOINT_EVERY_N_SOCS = 10
+CHECKPOINT_MAX_INTERVAL_SECONDS = 30
 
 # --- Logger Setup ---
 logger = logging.getLogger("SimplifiedAdmin")
 if not logger.handlers: # Ensure logger is configured to avoid duplicate handlers on Streamlit reruns
     logger.setLevel(logging.INFO)
+    output_handlers = []
     # File handler for persistent logs
     try:
-        file_handler = logging.FileHandler(LOG_FILE_SIMPLIFIED, mode='a') # Append mode
+        file_handler = logging.handlers.RotatingFileHandler(LOG_FILE_SIMPLIFIED, mode='a', maxBytes=LOG_FILE_MAX_BYTES, backupCount=1, delay=True) # Append mode; file opened on first record
         file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        output_handlers.append(file_handler)
     except Exception as e_fh:
         logging.error(f"Simplified Admin: Could not set up file logging: {e_fh}") # Use root logger if module logger fails
     
@@ -39,12 +52,35 @@ if not logger.handlers: # Ensure logger is configured to avoid duplicate handler
     stream_handler = logging.StreamHandler()
     stream_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     stream_handler.setFormatter(stream_formatter)
-    logger.addHandler(stream_handler)
+    output_handlers.append(stream_handler)
+    
+    # Log calls only enqueue the record; a background listener thread does the file and console I/O,
+    # so batch processing never blocks on disk writes
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop) # Flush queued records on shutdown
 
 # --- Helper Functions ---
+def _get_bls_job_mapper():
+    """Imports bls_job_mapper on first use; returns None if it is missing or fails to import."""
+    global _bls_job_mapper, MODULE_IMPORT_SUCCESS
+    if _bls_job_mapper is None and MODULE_IMPORT_SUCCESS:
+        try:
+            import bls_job_mapper
+            _bls_job_mapper = bls_job_mapper
+        except ImportError as e:
+            MODULE_IMPORT_SUCCESS = False
+            # This error will be logged, and the UI function will show a message.
+            logger.critical(f"Simplified Admin: CRITICAL IMPORT ERROR: {e}. Admin functions disabled.")
+    return _bls_job_mapper
+
+@st.cache_data(ttl=3600, show_spinner=False)
 def _get_all_target_socs_from_mapper():
-    """Retrieves the target SOC codes and their representative titles from bls_job_mapper."""
-    if MODULE_IMPORT_SUCCESS and hasattr(bls_job_mapper, 'JOB_TITLE_TO_SOC'):
+    """Retrieves the target SOC codes and their representative titles from bls_job_mapper (cached; the mapping is static)."""
+    bls_job_mapper = _get_bls_job_mapper()
+    if bls_job_mapper is not None and hasattr(bls_job_mapper, 'JOB_TITLE_TO_SOC'):
         # Create a dictionary of SOC: Title, ensuring unique SOCs
         soc_map = {}
         for title, soc in bls_job_mapper.JOB_TITLE_TO_SOC.items():
@@ -58,96 +94,164 @@ def _get_all_target_socs_from_mapper():
         "29-1141": "Registered Nurse (Default)"
     }
 
-def _load_population_progress_simplified():
-    """Loads population progress from the JSON file."""
-    target_soc_map = _get_all_target_socs_from_mapper()
-    default_progress = {
+@st.cache_data(ttl=3600, show_spinner=False)
+def _get_target_soc_map_digest():
+    """Fingerprint of the target SOC map, including its processing order; stored in the progress file to detect map changes."""
+    return hashlib.blake2b(orjson.dumps(_get_all_target_socs_from_mapper()), digest_size=16).hexdigest()
+
+def _default_population_progress(target_soc_map):
+    """Returns a fresh, empty progress record for the given SOC: Title map."""
+    return {
+        "_schema_version": PROGRESS_SCHEMA_VERSION,
         "target_soc_map": target_soc_map, # Store SOC: Title map
-        "ordered_soc_keys": list(target_soc_map.keys()), # Maintain an order for processing
+        "target_soc_map_digest": _get_target_soc_map_digest(),
         "current_index": 0,
         "processed_this_session": 0, # Count for the current UI session/run
         "total_processed_ever": 0, # Overall count from file
-        "successfully_populated_socs": [],
+        "successfully_populated_socs": set(), # Kept as a set in memory; saved as a sorted list
         "failed_socs": {}, # Store SOC: error_message
         "last_run_timestamp": None,
         "total_target_socs": len(target_soc_map)
     }
+
+def _migrate_progress_v1(loaded_data):
+    """v1 -> v2: v1 files have no schema version and may lack target_soc_map_digest; derive it if the stored map is current."""
+    if "target_soc_map_digest" not in loaded_data and loaded_data.get("target_soc_map") == _get_all_target_socs_from_mapper():
+        loaded_data["target_soc_map_digest"] = _get_target_soc_map_digest()
+    return loaded_data
+
+def _migrate_progress_v2(loaded_data):
+    """v2 -> v3: the processing order is the key order of target_soc_map, so ordered_soc_keys is no longer stored."""
+    loaded_data.pop("ordered_soc_keys", None)
+    return loaded_data
+
+# Schema version -> function upgrading a loaded progress dict to the next version
+_PROGRESS_MIGRATIONS = {1: _migrate_progress_v1, 2: _migrate_progress_v2}
+
+def _load_population_progress_simplified():
+    """Loads population progress from the JSON file."""
+    target_soc_map = _get_all_target_socs_from_mapper()
+    default_progress = _default_population_progress(target_soc_map)
     if os.path.exists(POPULATION_PROGRESS_FILE_SIMPLIFIED):
         try:
-            with open(POPULATION_PROGRESS_FILE_SIMPLIFIED, "r") as f:
-                loaded_data = json.load(f)
-                # Validate and merge, ensuring target_soc_map is updated if bls_job_mapper changed
-                if loaded_data.get("target_soc_map") != target_soc_map:
-                    logger.info("Simplified Admin: Target SOC map changed. Resetting progress index and counts for consistency.")
-                    loaded_data["target_soc_map"] = target_soc_map
-                    loaded_data["ordered_soc_keys"] = list(target_soc_map.keys())
-                    loaded_data["total_target_socs"] = len(target_soc_map)
-                    loaded_data["current_index"] = 0 # Reset index if map changes
-                    loaded_data["total_processed_ever"] = 0 # Reset overall count
-                    loaded_data["successfully_populated_socs"] = []
-                    loaded_data["failed_socs"] = {}
-                # Ensure all keys from default_progress are present
-                for key, value in default_progress.items():
-                    if key not in loaded_data:
-                        loaded_data[key] = value
-                return loaded_data
-        except (IOError, json.JSONDecodeError) as e:
+            with open(POPULATION_PROGRESS_FILE_SIMPLIFIED, "rb") as f:
+                loaded_data = orjson.loads(f.read())
+            schema_version = loaded_data.get("_schema_version", 1)
+            if schema_version > PROGRESS_SCHEMA_VERSION:
+                logger.error(f"Simplified Admin: Progress file '{POPULATION_PROGRESS_FILE_SIMPLIFIED}' uses schema {schema_version}, newer than supported ({PROGRESS_SCHEMA_VERSION}). Using default.")
+                return default_progress
+            while schema_version < PROGRESS_SCHEMA_VERSION:
+                loaded_data = _PROGRESS_MIGRATIONS[schema_version](loaded_data)
+                schema_version += 1
+                logger.info(f"Simplified Admin: Migrated progress file to schema {schema_version}.")
+            loaded_data["_schema_version"] = PROGRESS_SCHEMA_VERSION
+            
+            # Validate and merge, ensuring target_soc_map is updated if bls_job_mapper changed.
+            # Comparing digests avoids a full dict comparison.
+            if loaded_data.get("target_soc_map_digest") != default_progress["target_soc_map_digest"]:
+                logger.info("Simplified Admin: Target SOC map changed. Keeping progress for SOCs still in the map and restarting the index.")
+                # Only SOCs removed from the map lose their status; populated ones are skipped on the next pass
+                kept_successes = [soc for soc in loaded_data.get("successfully_populated_socs", []) if soc in target_soc_map]
+                kept_failures = {soc: err for soc, err in loaded_data.get("failed_socs", {}).items() if soc in target_soc_map}
+                loaded_data["target_soc_map"] = target_soc_map
+                loaded_data["target_soc_map_digest"] = default_progress["target_soc_map_digest"]
+                loaded_data["total_target_socs"] = len(target_soc_map)
+                loaded_data["current_index"] = 0 # Reset index if map changes
+                loaded_data["total_processed_ever"] = len(kept_successes) + len(kept_failures)
+                loaded_data["successfully_populated_socs"] = kept_successes
+                loaded_data["failed_socs"] = kept_failures
+            # Ensure all keys from default_progress are present
+            for key, value in default_progress.items():
+                if key not in loaded_data:
+                    loaded_data[key] = value
+            loaded_data["successfully_populated_socs"] = set(loaded_data["successfully_populated_socs"])
+            return loaded_data
+        except (IOError, orjson.JSONDecodeError, AttributeError, KeyError, TypeError) as e: # Unreadable, or not a progress record
             logger.error(f"Simplified Admin: Error loading progress file '{POPULATION_PROGRESS_FILE_SIMPLIFIED}': {e}. Using default.")
     return default_progress
 
+# The worker's final save can overlap the shutdown flush, so saves are serialized
+_progress_save_lock = threading.Lock()
+
 def _save_population_progress_simplified(progress_data):
-    """Saves population progress to the JSON file."""
-    progress_data["last_run_timestamp"] = datetime.datetime.now().isoformat()
+    """Saves population progress to the JSON file; returns None on success, else the error message to report."""
+    progress_data["last_run_timestamp"] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds") # ISO 8601 UTC, comparable across machines
+    progress_path = os.path.abspath(POPULATION_PROGRESS_FILE_SIMPLIFIED)
+    temp_path = None
     try:
-        with open(POPULATION_PROGRESS_FILE_SIMPLIFIED, "w") as f:
-            json.dump(progress_data, f, indent=4)
+        # Write to a uniquely named temporary file and swap it in, so an interrupted save never leaves a truncated checkpoint
+        with _progress_save_lock:
+            serializable_progress = dict(progress_data, successfully_populated_socs=sorted(progress_data["successfully_populated_socs"]))
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(progress_path), prefix=f"{os.path.basename(progress_path)}.", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(serializable_progress))
+            os.replace(temp_path, progress_path)
+            temp_path = None
+        _checkpoint_state.update(unsaved_socs=0, last_save=time.monotonic(), progress=None)
         logger.info(f"Simplified Admin: Saved population progress to {POPULATION_PROGRESS_FILE_SIMPLIFIED}")
-    except IOError as e:
+        return None
+    except (OSError, TypeError, ValueError, RuntimeError) as e: # I/O, unserializable values, or the SOC set changing mid-sort at shutdown
         logger.error(f"Simplified Admin: Error saving progress file '{POPULATION_PROGRESS_FILE_SIMPLIFIED}': {e}")
-        if st._is_running_with_streamlit: # Check if in Streamlit context before using st
-             st.warning(f"Could not save population progress: {e}")
+        # Usually called from the background worker, which has no Streamlit context; callers report the message
+        return f"Could not save population progress: {e}"
+    finally:
+        if temp_path is not None: # Only still set if the swap did not happen
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
 
+# Progress processed since the last save; "progress" is kept so it can still be written at shutdown
+_checkpoint_state = {"unsaved_socs": 0, "last_save": time.monotonic(), "progress": None}
 
-def _process_one_soc(soc_code: str, representative_title: str, engine, current_logs_list: list):
-    """Processes a single SOC code: fetches data and updates logs."""
+def _checkpoint_population_progress(progress_data, processed_socs: int):
+    """
+    Saves progress after a batch only once CHECKPOINT_EVERY_N_SOCS SOCs or CHECKPOINT_MAX_INTERVAL_SECONDS have accumulated.
+    Returns the save error message, or None if the save succeeded or was not due yet.
+    """
+    _checkpoint_state["unsaved_socs"] += processed_socs
+    _checkpoint_state["progress"] = progress_data
+    if (_checkpoint_state["unsaved_socs"] >= CHECKPOINT_EVERY_N_SOCS
+            or time.monotonic() - _checkpoint_state["last_save"] >= CHECKPOINT_MAX_INTERVAL_SECONDS):
+        return _save_population_progress_simplified(progress_data)
+    return None
+
+def _flush_population_checkpoint():
+    """Writes any progress not yet checkpointed; registered to run at interpreter shutdown."""
+    if _checkpoint_state["progress"] is not None:
+        _save_population_progress_simplified(_checkpoint_state["progress"])
+
+atexit.register(_flush_population_checkpoint)
+
+def _process_one_soc(soc_code: str, representative_title: str, engine, current_logs_list: list, pending_records: list):
+    """
+    Processes a single SOC code: fetches data from the BLS API and updates logs.
+    The row is appended to pending_records for the caller to save with the rest of the batch.
+    """
     log_msg_start = f"Processing SOC: {soc_code} (Rep. Title: '{representative_title}')"
     current_logs_list.append(log_msg_start)
     logger.info(log_msg_start)
     
-    if not MODULE_IMPORT_SUCCESS or not hasattr(bls_job_mapper, 'get_complete_job_data'):
-        error_msg = f"CRITICAL_ERROR for SOC {soc_code}: bls_job_mapper.get_complete_job_data is not available."
+    bls_job_mapper = _get_bls_job_mapper()
+    if bls_job_mapper is None or not hasattr(bls_job_mapper, 'build_soc_data_record'):
+        error_msg = f"CRITICAL_ERROR for SOC {soc_code}: bls_job_mapper.build_soc_data_record is not available."
         current_logs_list.append(error_msg)
         logger.error(error_msg)
         return False, error_msg # Indicate failure
 
     try:
-        # bls_job_mapper.get_complete_job_data is expected to handle DB saving internally if data is fetched from API
-        job_data = bls_job_mapper.get_complete_job_data(representative_title) # Pass title, it resolves SOC
-        
-        if job_data and "error" not in job_data:
-            # Verify that the returned SOC matches the one we intended to process, if possible
-            returned_soc = job_data.get("occupation_code")
-            if returned_soc != soc_code and returned_soc != "00-0000": # Allow 00-0000 as a generic non-match
-                warn_msg = f"WARNING for SOC {soc_code}: bls_job_mapper returned data for SOC {returned_soc} when processing '{representative_title}'."
-                current_logs_list.append(warn_msg)
-                logger.warning(warn_msg)
-            
-            success_msg = f"SUCCESS: Data fetched/updated for SOC {soc_code} ('{job_data.get('job_title', representative_title)}'). Source: {job_data.get('source', 'N/A')}"
-            current_logs_list.append(success_msg)
-            logger.info(success_msg)
-            return True, None # Indicate success
-            
-        elif job_data and "error" in job_data:
-            error_msg = f"API/DB_ERROR for SOC {soc_code}: {job_data['error']}"
+        record, message = bls_job_mapper.build_soc_data_record(soc_code, representative_title)
+        if record is None:
+            error_msg = f"API/DB_ERROR for SOC {soc_code}: {message}"
             current_logs_list.append(error_msg)
             logger.error(error_msg)
-            return False, job_data['error'] # Indicate failure
-            
-        else: # Should not happen if job_data is always a dict
-            unknown_err_msg = f"UNKNOWN_STATE for SOC {soc_code}: No data and no specific error returned from bls_job_mapper."
-            current_logs_list.append(unknown_err_msg)
-            logger.error(unknown_err_msg)
-            return False, "Unknown state or no data returned."
+            return False, message
+        
+        pending_records.append(record) # Saved by the caller together with the rest of the batch
+        success_msg = f"SUCCESS: Data fetched for SOC {soc_code} ('{representative_title}'). Source: bls_api (saved with batch)"
+        current_logs_list.append(success_msg)
+        logger.info(success_msg)
+        return True, None
 
     except Exception as e:
         exc_error_msg = f"EXCEPTION during processing of SOC {soc_code}: {e}"
@@ -155,32 +259,156 @@ def _process_one_soc(soc_code: str, representative_title: str, engine, current_l
         logger.error(exc_error_msg, exc_info=True)
         return False, str(e) # Indicate failure
 
-# --- Main UI Function to be called from app.py ---
-def display_admin_controls(engine_instance):
+async def _process_one_soc_async(soc_code: str, representative_title: str, engine, semaphore: asyncio.Semaphore, api_delay: float, pending_records: list, fresh_socs: set):
+    """Runs _process_one_soc on a worker thread; returns its result and the SOC's own log lines."""
+    soc_logs = []
+    if soc_code in fresh_socs:
+        cached_msg = f"CACHED: Data for SOC {soc_code} is already fresh in the database. Skipped API call."
+        soc_logs.append(cached_msg)
+        logger.info(cached_msg)
+        return (True, None), soc_logs
+    async with semaphore:
+        result = await asyncio.to_thread(_process_one_soc, soc_code, representative_title, engine, soc_logs, pending_records)
+        await asyncio.sleep(api_delay) # Hold the slot so calls through it stay spaced out for the API rate limit
+    return result, soc_logs
+
+async def _process_soc_batch(soc_codes: list, target_soc_map: dict, engine, api_delay: float, pending_records: list, fresh_socs: set):
+    """Processes a batch of SOC codes concurrently, at most MAX_CONCURRENT_SOC_FETCHES at a time; fresh_socs are skipped."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SOC_FETCHES)
+    tasks = [
+        _process_one_soc_async(soc_code, target_soc_map.get(soc_code, f"Unknown for {soc_code}"), engine, semaphore, api_delay, pending_records, fresh_socs)
+        for soc_code in soc_codes
+    ]
+    return await asyncio.gather(*tasks, return_exceptions=True) # Results come back in the order of soc_codes
+
+def _invalidate_comparison_caches():
     """
-    Displays admin controls for database population within the main Streamlit app.
-    Args:
-        engine_instance: The SQLAlchemy engine instance from the main app.
+    Drops the cached comparison sets and the per-title job data beneath them, which would
+    otherwise show the replaced rows until their TTLs expire.
     """
-    if not MODULE_IMPORT_SUCCESS:
-        st.error("Simplified Admin Panel: Essential modules (like bls_job_mapper) could not be imported. Database population functionality is disabled. Please check application logs.")
+    try:
+        # Already loaded by app.py; imported here to keep the admin module's startup light
+        import job_api_integration_database_only
+        import simple_comparison
+    except ImportError as e:
+        logger.warning(f"Simplified Admin: Could not import the comparison modules to invalidate their caches: {e}")
         return
+    simple_comparison.invalidate_cache()
+    job_api_integration_database_only.invalidate_job_data_cache() # Cleared too, or the set cache would refill from it
 
-    st.subheader("Simplified Admin: Database Population Tool")
+def _run_population_batch(progress_data, engine, batch_size: int, api_delay: float, force_refresh: bool, batch_logs: list) -> bool:
+    """Processes the next batch of SOCs into progress_data; returns False once no SOCs are left to process."""
+    bls_job_mapper = _get_bls_job_mapper()
+    ordered_soc_keys = tuple(progress_data["target_soc_map"]) # Processing order is the map's key order
+    current_idx = progress_data.get("current_index", 0)
     
-    if engine_instance is None:
-        st.error("Database engine is not available. Cannot run population tool.")
-        logger.error("Simplified Admin: display_admin_controls called with no engine_instance.")
-        return
+    # Next batch_size SOCs from current_idx on, skipping any already populated successfully
+    populated_socs = progress_data["successfully_populated_socs"]
+    batch_positions = []
+    for position in range(current_idx, len(ordered_soc_keys)):
+        if ordered_soc_keys[position] not in populated_socs:
+            batch_positions.append(position)
+            if len(batch_positions) == batch_size:
+                break
+    soc_codes_for_this_run = [ordered_soc_keys[position] for position in batch_positions]
+    
+    if not soc_codes_for_this_run:
+        progress_data["current_index"] = len(ordered_soc_keys) # Everything left was already populated
+        batch_logs.append("🎉 All target SOC codes have been processed!")
+        logger.info("Simplified Admin: Population process completed all target SOCs.")
+        return False
+    
+    # Fetch the whole batch concurrently; logs are merged afterwards in SOC order.
+    # One query finds SOCs whose rows are still fresh, so they skip the BLS API entirely
+    fresh_socs = set() if force_refresh else bls_job_mapper.get_fresh_soc_codes(soc_codes_for_this_run)
+    pending_records = []
+    batch_results = asyncio.run(_process_soc_batch(soc_codes_for_this_run, progress_data["target_soc_map"], engine, api_delay, pending_records, fresh_socs))
+    
+    # Newly fetched rows are written in one transaction instead of one commit per SOC
+    unsaved_socs = set()
+    if pending_records:
+        if bls_job_mapper.save_bls_data_batch_to_db(pending_records):
+            _invalidate_comparison_caches()
+        else:
+            unsaved_socs = {record["occupation_code"] for record in pending_records}
+            save_error_msg = f"DB_ERROR: Failed to save {len(pending_records)} fetched SOC(s) to the database."
+            batch_logs.append(save_error_msg)
+            logger.error(save_error_msg)
+    
+    # Merge into locals and write the counters back once after the loop
+    failed_socs = progress_data["failed_socs"]
+    total_processed_ever = progress_data.get("total_processed_ever", 0)
+    for soc_code_to_process, batch_result in zip(soc_codes_for_this_run, batch_results):
+        if isinstance(batch_result, BaseException):
+            is_success, error_detail = False, str(batch_result)
+            exc_error_msg = f"EXCEPTION during processing of SOC {soc_code_to_process}: {batch_result}"
+            batch_logs.append(exc_error_msg)
+            logger.error(exc_error_msg)
+        else:
+            (is_success, error_detail), soc_logs = batch_result
+            batch_logs.extend(soc_logs)
+            if is_success and soc_code_to_process in unsaved_socs:
+                is_success, error_detail = False, "Failed to save data to the database."
+        
+        if soc_code_to_process not in failed_socs: # A retried failure was already counted
+            total_processed_ever += 1
+        
+        if is_success:
+            populated_socs.add(soc_code_to_process)
+            failed_socs.pop(soc_code_to_process, None)
+        else:
+            failed_socs[soc_code_to_process] = error_detail or "Processing failed"
+    
+    processed_in_this_batch = len(soc_codes_for_this_run)
+    progress_data["total_processed_ever"] = total_processed_ever
+    progress_data["current_index"] = batch_positions[-1] + 1 # Just past the last SOC processed
+    
+    batch_logs.append(f"--- Batch of {processed_in_this_batch} SOC(s) Finished at {datetime.datetime.now().strftime('%H:%M:%S')} ---")
+    save_error_msg = _checkpoint_population_progress(progress_data, processed_in_this_batch)
+    if save_error_msg:
+        batch_logs.append(f"SAVE_ERROR: {save_error_msg}")
+    return True
 
-    # Initialize session state variables if they don't exist
-    if "s_admin_population_running" not in st.session_state:
-        st.session_state.s_admin_population_running = False
-    if "s_admin_current_batch_logs" not in st.session_state:
-        st.session_state.s_admin_current_batch_logs = []
-    if "s_admin_population_progress" not in st.session_state:
-        st.session_state.s_admin_population_progress = _load_population_progress_simplified()
+# The background population run, shared by all sessions so a second browser tab cannot start a parallel run.
+# "logs" is the one batch log every session displays. Starting a run, resetting progress and
+# touching the log hold _population_run_lock, since a click from a stale tab still arrives
+_population_run = {"thread": None, "stop_event": None, "logs": deque(maxlen=MAX_DISPLAYED_LOG_LINES), "progress": None}
+_population_run_lock = threading.Lock()
+
+def _append_population_logs(*log_lines: str):
+    """Adds lines to the shared batch log; must not be called while holding _population_run_lock."""
+    with _population_run_lock:
+        _population_run["logs"].extend(log_lines)
 
+def _population_worker(progress_data, engine, batch_size: int, api_delay: float, force_refresh: bool, stop_event: threading.Event):
+    """Background thread body: runs batches until every SOC is processed or stop_event is set, then saves progress."""
+    try:
+        while not stop_event.is_set():
+            batch_logs = []
+            has_more = _run_population_batch(progress_data, engine, batch_size, api_delay, force_refresh, batch_logs)
+            _append_population_logs(*batch_logs)
+            if not has_more:
+                break
+        if stop_event.is_set():
+            _append_population_logs(f"--- Paused at {datetime.datetime.now().strftime('%H:%M:%S')} ---")
+    except Exception as e:
+        exc_error_msg = f"EXCEPTION in population run: {e}"
+        _append_population_logs(exc_error_msg)
+        logger.error(exc_error_msg, exc_info=True)
+    finally:
+        save_error_msg = _save_population_progress_simplified(progress_data)
+        if save_error_msg:
+            _append_population_logs(f"SAVE_ERROR: {save_error_msg}")
+
+def _population_run_active() -> bool:
+    """True while a background population run is still working."""
+    return _population_run["thread"] is not None and _population_run["thread"].is_alive()
+
+def _render_population_status():
+    """Overall progress, run status and batch log; rerun on its own as a fragment while a run is active."""
+    with _population_run_lock:
+        batch_logs = list(_population_run["logs"])
+    
     progress_data = st.session_state.s_admin_population_progress
     total_target_socs = progress_data.get("total_target_socs", 0)
     current_idx = progress_data.get("current_index", 0)
@@ -193,100 +421,108 @@ def display_admin_controls(engine_instance):
         st.progress(total_processed_ever / total_target_socs)
     else:
         st.info("No target SOCs defined for population (list might be empty or bls_job_mapper not loaded).")
+    
+    if st.session_state.s_admin_population_running:
+        st.status("Population run in progress...", state="running", expanded=False)
+    
+    if batch_logs:
+        st.caption(f"Current Batch Log (last {MAX_DISPLAYED_LOG_LINES} lines)")
+        with st.container(height=200):
+            st.code("\n".join(batch_logs), language=None)
+    
+    if st.session_state.s_admin_population_running and not _population_run_active():
+        st.rerun() # The run just ended: refresh the whole panel once so the controls and failure summary update
 
+# --- Main UI Function to be called from app.py ---
+def display_admin_controls(engine_instance):
+    """
+    Displays admin controls for database population within the main Streamlit app.
+    Args:
+        engine_instance: The SQLAlchemy engine instance from the main app.
+    """
+    if _get_bls_job_mapper() is None:
+        st.error("Simplified Admin Panel: Essential modules (like bls_job_mapper) could not be imported. Database population functionality is disabled. Please check application logs.")
+        return
+
+    st.subheader("Simplified Admin: Database Population Tool")
+    
+    if engine_instance is None:
+        st.error("Database engine is not available. Cannot run population tool.")
+        logger.error("Simplified Admin: display_admin_controls called with no engine_instance.")
+        return
+
+    # Initialize session state variables if they don't exist
+    if _population_run_active():
+        # Show the progress the background run is updating, even from a session that did not start it
+        st.session_state.s_admin_population_progress = _population_run["progress"]
+    elif "s_admin_population_progress" not in st.session_state:
+        st.session_state.s_admin_population_progress = _load_population_progress_simplified()
+    st.session_state.s_admin_population_running = _population_run_active()
+
+    # Progress and log refresh on their own every few seconds while a run is active, without rerunning the whole app
+    st.experimental_fragment(run_every=2 if st.session_state.s_admin_population_running else None)(_render_population_status)()
 
-    batch_size = st.number_input("Batch Size (SOCs per run)", min_value=1, max_value=20, value=3, step=1,
-                                 key="s_admin_batch_size", help="Number of SOCs to process in one click of 'Start/Resume'. Small batches are recommended for web environments.")
+    batch_size = st.number_input("Batch Size (SOCs per batch)", min_value=1, max_value=20, value=3, step=1,
+                                 key="s_admin_batch_size", help="Number of SOCs fetched and saved together. Batches repeat in the background until every SOC is processed or the run is paused.")
     api_delay = st.number_input("Delay Between API Calls (seconds)", min_value=0.5, max_value=5.0, value=1.0, step=0.1,
-                                key="s_admin_api_delay", help="Time to wait between fetching data for each SOC to respect API rate limits.")
+                                key="s_admin_api_delay", help=f"Time each of the (up to {MAX_CONCURRENT_SOC_FETCHES}) concurrent fetches waits before starting the next SOC, to respect API rate limits.")
+    force_refresh = st.checkbox("Force refresh (re-fetch SOCs that are already fresh in the database)", value=False, key="s_admin_force_refresh")
 
     col_run, col_pause, col_reset = st.columns(3)
     with col_run:
-        if st.button("▶️ Start/Resume Batch", type="primary", disabled=st.session_state.s_admin_population_running, use_container_width=True):
-            st.session_state.s_admin_population_running = True
-            st.session_state.s_admin_current_batch_logs = [f"--- New Batch Started at {datetime.datetime.now().strftime('%H:%M:%S')} ---"]
-            logger.info("Simplified Admin: Population batch started by admin.")
+        if st.button("▶️ Start/Resume", type="primary", disabled=st.session_state.s_admin_population_running, use_container_width=True):
+            with _population_run_lock:
+                already_running = _population_run_active() # A double-click or another tab may have started one already
+                if not already_running:
+                    # This session's copy may predate progress saved by a run from another tab, so start from the file
+                    progress_data = _load_population_progress_simplified()
+                    st.session_state.s_admin_population_progress = progress_data
+                    stop_event = threading.Event()
+                    worker = threading.Thread(
+                        target=_population_worker,
+                        args=(progress_data, engine_instance, batch_size, api_delay, force_refresh, stop_event),
+                        name="SimplifiedAdminPopulation",
+                        daemon=True
+                    )
+                    _population_run.update(thread=worker, stop_event=stop_event, progress=progress_data)
+                    _population_run["logs"].clear()
+                    _population_run["logs"].append(f"--- Population Run Started at {datetime.datetime.now().strftime('%H:%M:%S')} ---")
+                    worker.start()
+            if already_running:
+                # Shown through the batch log, which survives the rerun
+                _append_population_logs("Admin: Start ignored; a population run is already in progress.")
+            else:
+                logger.info("Simplified Admin: Population run started by admin.")
             st.rerun() 
-    with col_pause: # This button primarily serves to stop a continuous run if implemented, or as a visual cue
+    with col_pause:
         if st.button("⏸️ Pause (Stop Auto-Run)", disabled=not st.session_state.s_admin_population_running, use_container_width=True):
-            st.session_state.s_admin_population_running = False
+            _population_run["stop_event"].set() # The worker finishes its current batch, then saves progress
+            _append_population_logs("Admin: Pause requested; stopping after the current batch.")
             logger.info("Simplified Admin: Population process marked as paused by admin.")
-            _save_population_progress_simplified(st.session_state.s_admin_population_progress) # Save current state
             st.rerun()
     with col_reset:
         if st.button("🔄 Reset All Progress", use_container_width=True, help="Resets all population progress. Does not delete DB data."):
-            if st.session_state.s_admin_population_running:
+            with _population_run_lock:
+                run_active = _population_run_active() # The session flag may predate a run started from another tab
+                if not run_active:
+                    # Start from empty progress for the current SOC map; no need to re-read the file being discarded
+                    st.session_state.s_admin_population_progress = _default_population_progress(_get_all_target_socs_from_mapper())
+                    save_error_msg = _save_population_progress_simplified(st.session_state.s_admin_population_progress)
+                    _population_run["logs"].clear()
+                    _population_run["logs"].append("Admin: Population progress has been reset.")
+                    if save_error_msg:
+                        _population_run["logs"].append(f"SAVE_ERROR: {save_error_msg}")
+            if run_active:
                 st.warning("Please pause the population process before resetting.")
             else:
-                st.session_state.s_admin_population_progress = _load_population_progress_simplified() # Reloads defaults, including new SOC map
-                # Explicitly reset counts and lists
-                st.session_state.s_admin_population_progress["current_index"] = 0
-                st.session_state.s_admin_population_progress["total_processed_ever"] = 0
-                st.session_state.s_admin_population_progress["processed_this_session"] = 0
-                st.session_state.s_admin_population_progress["successfully_populated_socs"] = []
-                st.session_state.s_admin_population_progress["failed_socs"] = {}
-                
-                _save_population_progress_simplified(st.session_state.s_admin_population_progress)
-                st.session_state.s_admin_current_batch_logs = ["Admin: Population progress has been reset."]
                 logger.info("Simplified Admin: Population progress reset by admin.")
                 st.rerun()
-    
-    log_placeholder = st.empty()
-    if st.session_state.s_admin_current_batch_logs:
-        log_placeholder.text_area("Current Batch Log", "\n".join(st.session_state.s_admin_current_batch_logs), height=200, key="s_admin_batch_log_display", disabled=True)
 
-    if st.session_state.s_admin_population_running:
-        # This block will execute if "Start/Resume Batch" was clicked
-        progress_data = st.session_state.s_admin_population_progress
-        ordered_soc_keys = progress_data.get("ordered_soc_keys", [])
-        current_idx = progress_data.get("current_index", 0)
-        
-        if current_idx >= len(ordered_soc_keys):
-            st.success("🎉 All target SOC codes have been processed!")
-            logger.info("Simplified Admin: Population process completed all target SOCs.")
-            st.session_state.s_admin_population_running = False # Stop running
-            progress_data["last_run_timestamp"] = datetime.datetime.now().isoformat()
-            _save_population_progress_simplified(progress_data)
-            st.rerun() # Update UI to reflect completion
-        else:
-            soc_codes_for_this_run = ordered_soc_keys[current_idx : current_idx + batch_size]
-            
-            if not soc_codes_for_this_run:
-                 st.info("No more SOCs in the current list to process for this batch run.")
-                 st.session_state.s_admin_population_running = False
-                 _save_population_progress_simplified(progress_data)
-                 st.rerun()
-            else:
-                processed_in_this_batch = 0
-                for i, soc_code_to_process in enumerate(soc_codes_for_this_run):
-                    # Get representative title for this SOC
-                    rep_title = progress_data["target_soc_map"].get(soc_code_to_process, f"Unknown for {soc_code_to_process}")
-                    
-                    is_success, error_detail = _process_one_soc(soc_code_to_process, rep_title, engine_instance, st.session_state.s_admin_current_batch_logs)
-                    
-                    progress_data["total_processed_ever"] = progress_data.get("total_processed_ever", 0) + 1
-                    progress_data["current_index"] = current_idx + i + 1 # Update index after processing
-                    
-                    if is_success:
-                        if soc_code_to_process not in progress_data["successfully_populated_socs"]:
-                             progress_data["successfully_populated_socs"].append(soc_code_to_process)
-                        if soc_code_to_process in progress_data["failed_socs"]:
-                            del progress_data["failed_socs"][soc_code_to_process]
-                    else:
-                        progress_data["failed_socs"][soc_code_to_process] = error_detail or "Processing failed"
-                    
-                    processed_in_this_batch += 1
-                    
-                    # Update log display immediately
-                    log_placeholder.text_area("Current Batch Log", "\n".join(st.session_state.s_admin_current_batch_logs), height=200, key=f"s_admin_log_update_{i}", disabled=True)
-                    
-                    if i < len(soc_codes_for_this_run) - 1: # If not the last item in this specific run's batch
-                        time.sleep(api_delay) # Delay between SOC processing calls
-                
-                st.session_state.s_admin_current_batch_logs.append(f"--- Batch of {processed_in_this_batch} SOC(s) Finished at {datetime.datetime.now().strftime('%H:%M:%S')} ---")
-                st.session_state.s_admin_population_running = False # Stop after one batch, user clicks to continue
-                _save_population_progress_simplified(progress_data)
-                st.rerun() # Rerun to update UI and allow next batch click
+    if not st.session_state.s_admin_population_running and os.path.exists(LOG_FILE_SIMPLIFIED):
+        # The log is only read when asked for, not on every rerun of the page
+        if st.button("📄 Prepare Full Log"):
+            with open(LOG_FILE_SIMPLIFIED, "rb") as log_file:
+                st.download_button("⬇️ Download Full Log", log_file.read(), file_name=os.path.basename(LOG_FILE_SIMPLIFIED), mime="text/plain")
 
     st.markdown("---")
     st.subheader("Summary of Failed SOC Populations")
@@ -294,7 +530,7 @@ def display_admin_controls(engine_instance):
     if failed_socs_data:
         st.warning(f"Found {len(failed_socs_data)} SOC codes that previously failed or had errors.")
         # Display as a simple list for brevity in simplified admin
-        for soc, err in failed_socs_data.items():
+        for soc, err in list(failed_socs_data.items()): # Snapshot; a background run may still be updating it
             st.text(f"- {soc}: {err}")
     else:
         st.info("No SOC codes are currently marked as having failed population.")
@@ -1,7 +1,8 @@
 import os
 import sys
-import time
 import logging
+import importlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 
 # --- Configuration for colored output ---
@@ -16,20 +17,28 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Prefixes and suffixes are built once; each print is then a plain concatenation
+_HEADER_PREFIX = f"\n{Colors.HEADER}{Colors.BOLD}===== "
+_HEADER_SUFFIX = f" ====={Colors.ENDC}"
+_SUCCESS_PREFIX = f"{Colors.OKGREEN}[SUCCESS] "
+_FAILURE_PREFIX = f"{Colors.FAIL}[FAILURE] "
+_WARNING_PREFIX = f"{Colors.WARNING}[WARNING] "
+_INFO_PREFIX = f"{Colors.OKBLUE}[INFO] "
+
 def print_header(message: str):
-    print(f"\n{Colors.HEADER}{Colors.BOLD}===== {message} ====={Colors.ENDC}")
+    print(_HEADER_PREFIX + message + _HEADER_SUFFIX)
 
 def print_success(message: str):
-    print(f"{Colors.OKGREEN}[SUCCESS] {message}{Colors.ENDC}")
+    print(_SUCCESS_PREFIX + message + Colors.ENDC)
 
 def print_failure(message: str):
-    print(f"{Colors.FAIL}[FAILURE] {message}{Colors.ENDC}")
+    print(_FAILURE_PREFIX + message + Colors.ENDC)
 
 def print_warning(message: str):
-    print(f"{Colors.WARNING}[WARNING] {message}{Colors.ENDC}")
+    print(_WARNING_PREFIX + message + Colors.ENDC)
 
 def print_info(message: str):
-    print(f"{Colors.OKBLUE}[INFO] {message}{Colors.ENDC}")
+    print(_INFO_PREFIX + message + Colors.ENDC)
 
 # --- Logger Setup ---
 # Configure basic logging for the test script
@@ -41,18 +50,18 @@ logging.getLogger("bls_connector").setLevel(logging.WARNING)
 logging.getLogger("bls_job_mapper").setLevel(logging.WARNING)
 logging.getLogger("database").setLevel(logging.WARNING) # Assuming database.py also uses logging
 
-# --- Attempt to import necessary application modules ---
+# --- Application modules ---
 # This structure assumes the test script is in the root directory of the project,
-# and the modules are directly importable.
-try:
-    import database
-    import bls_connector
-    import job_api_integration_database_only as job_api # Main interface for data
-    import bls_job_mapper # To check its direct functions if needed
-except ImportError as e:
-    print_failure(f"Critical Import Error: {e}. Please ensure all required modules are in the Python path.")
-    print_warning("Some tests may not run or may behave unexpectedly.")
-    sys.exit(1)
+# and the modules are directly importable. They are imported by the tests that use them:
+# database connects to Neon and job_api pulls in bls_job_mapper at import time, which
+# check_env_vars and the single-service tests don't need.
+def _import_app_module(module_name: str):
+    """Imports an application module on first use; prints a failure and returns None if it can't be imported."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        print_failure(f"Critical Import Error: {e}. Please ensure all required modules are in the Python path.")
+        return None
 
 # --- Environment Variable Check ---
 DATABASE_URL = os.environ.get("DATABASE_URL")
@@ -79,33 +88,30 @@ def check_env_vars():
 
 # --- Test Functions ---
 
+# Titles the comparison test sends on purpose to check graceful failure
+INVALID_TITLES = frozenset({"DefinitelyNotARealJobTitleXYZ123"})
+
 def test_database_connectivity():
     print_header("Test 1: Database Connectivity to Neon")
     if not DATABASE_URL:
         print_warning("Skipping database connectivity test: DATABASE_URL not set.")
         return False
+    database = _import_app_module("database")
+    if database is None:
+        return False
     try:
-        # Use the check_database_health function if available and robust
-        if hasattr(database, 'check_database_health'):
-            health_status = database.check_database_health()
-            if health_status.get("status") == "healthy":
-                print_success(f"Database connection successful. (Message: {health_status.get('message')}, Response Time: {health_status.get('response_time_ms')}ms)")
-                return True
-            else:
-                print_failure(f"Database health check failed. Status: {health_status.get('status')}, Message: {health_status.get('message')}")
-                return False
+        # Probe the module's shared pooled engine, the one the later data tests use, instead of opening another
+        engine = database.get_db_engine()
+        if engine is None:
+            print_failure("Shared database engine is not initialised. Check DATABASE_URL and the database module logs.")
+            return False
+        health_status = database.check_database_health(engine) # "OK", "Error" or "Not Configured"
+        if health_status == "OK":
+            print_success("Database connection successful using the shared pooled engine.")
+            return True
         else:
-            # Fallback to a direct engine test if check_database_health is not found
-            print_info("database.check_database_health not found, attempting direct connection test.")
-            engine = database.create_db_engine(DATABASE_URL, max_retries=1) # Use the create_db_engine from database.py
-            if engine:
-                with engine.connect() as conn:
-                    conn.execute(database.text("SELECT 1"))
-                print_success("Direct database connection successful using database.create_db_engine.")
-                return True
-            else:
-                print_failure("Failed to create database engine using database.create_db_engine.")
-                return False
+            print_failure(f"Database health check failed. Status: {health_status}")
+            return False
     except Exception as e:
         print_failure(f"Database connectivity test failed with exception: {e}")
         logger.exception("Exception during database connectivity test:")
@@ -116,6 +122,9 @@ def test_bls_api_connectivity():
     if not BLS_API_KEY:
         print_warning("Skipping BLS API connectivity test: BLS_API_KEY not set.")
         return False
+    bls_connector = _import_app_module("bls_connector")
+    if bls_connector is None:
+        return False
     try:
         is_connected = bls_connector.check_api_connectivity()
         if is_connected:
@@ -134,6 +143,9 @@ def test_individual_job_searches():
     if not (DATABASE_URL and BLS_API_KEY):
         print_warning("Skipping individual job searches: DB_URL or API_KEY missing.")
         return False
+    job_api = _import_app_module("job_api_integration_database_only") # Main interface for data
+    if job_api is None:
+        return False
 
     test_jobs = [
         {"title": "Software Developer", "expect_success": True},
@@ -144,12 +156,16 @@ def test_individual_job_searches():
     ]
     all_passed = True
 
-    for job_info in test_jobs:
+    # The lookups are independent database/BLS round-trips, so run them together and report in order
+    with ThreadPoolExecutor(max_workers=len(test_jobs)) as executor:
+        futures = [executor.submit(job_api.get_job_data, job_info["title"]) for job_info in test_jobs]
+
+    for job_info, future in zip(test_jobs, futures):
         title = job_info["title"]
         expect_success = job_info["expect_success"]
         print_info(f"Testing job title: '{title}' (Expected to {'succeed' if expect_success else 'fail gracefully'})")
         try:
-            data = job_api.get_job_data(title)
+            data = future.result() # Re-raises any exception from the lookup
             if "error" not in data and data.get("occupation_code") != "00-0000":
                 if expect_success:
                     print_success(f"Successfully fetched data for '{data.get('job_title', title)}' (SOC: {data.get('occupation_code')})")
@@ -178,10 +194,9 @@ def test_individual_job_searches():
                     print_success(f"Gracefully handled '{title}' by returning generic data (SOC: {data.get('occupation_code')})")
         except Exception as e:
             print_failure(f"Test for '{title}' failed with an unexpected exception: {e}")
-            logger.exception(f"Exception during individual job search test for '{title}':")
+            logger.exception("Exception during individual job search test for '%s':", title)
             all_passed = False
         print("-" * 30)
-        time.sleep(1) # Be nice to the API if it's being hit directly by bls_job_mapper
     return all_passed
 
 def test_job_comparison():
@@ -189,6 +204,9 @@ def test_job_comparison():
     if not (DATABASE_URL and BLS_API_KEY):
         print_warning("Skipping job comparison: DB_URL or API_KEY missing.")
         return False
+    job_api = _import_app_module("job_api_integration_database_only") # Main interface for data
+    if job_api is None:
+        return False
 
     job_sets_to_compare = [
         ["Software Developer", "Web Developer", "Data Scientist"], # 3 jobs
@@ -197,30 +215,40 @@ def test_job_comparison():
     ]
     all_passed = True
 
+    # One comparison call for every distinct title (it fetches uncached titles in parallel); sets are checked from its result
+    unique_titles = list(dict.fromkeys(title for job_list in job_sets_to_compare for title in job_list))
+    try:
+        all_comparison_data = job_api.get_jobs_comparison_data(unique_titles)
+    except Exception as e:
+        print_failure(f"Comparison test failed with an unexpected exception: {e}")
+        logger.exception("Exception during job comparison test for %s:", unique_titles)
+        return False
+
     for i, job_list in enumerate(job_sets_to_compare):
         print_info(f"Testing comparison for job set {i+1}: {job_list}")
         try:
-            comparison_data = job_api.get_jobs_comparison_data(job_list)
+            comparison_data = {job_title: all_comparison_data[job_title] for job_title in job_list if job_title in all_comparison_data}
             if not comparison_data:
                 print_failure(f"Comparison for set {i+1} returned no data.")
                 all_passed = False
                 continue
 
+            expected_valid = sum(1 for jt in job_list if jt not in INVALID_TITLES)
             successful_jobs = 0
             for job_title, data in comparison_data.items():
                 if "error" not in data:
                     print_success(f"  Data for '{data.get('job_title', job_title)}' (SOC: {data.get('occupation_code')}): 5Y Risk {data.get('year_5_risk')}%")
                     successful_jobs +=1
                 else:
-                    if job_title == "DefinitelyNotARealJobTitleXYZ123": # Expected error
+                    if job_title in INVALID_TITLES: # Expected error
                          print_success(f"  Gracefully handled invalid title '{job_title}' in comparison: {data['error']}")
                     else:
                         print_warning(f"  Error for '{job_title}' in comparison: {data['error']}")
             
-            if successful_jobs == 0 and any(jt != "DefinitelyNotARealJobTitleXYZ123" for jt in job_list) :
+            if successful_jobs == 0 and expected_valid:
                 print_failure(f"No valid job data retrieved for comparison set {i+1}.")
                 all_passed = False
-            elif successful_jobs < sum(1 for jt in job_list if jt != "DefinitelyNotARealJobTitleXYZ123"):
+            elif successful_jobs < expected_valid:
                  print_warning(f"Partial success for comparison set {i+1}. Some jobs had errors.")
                  # Decide if this counts as a failure for `all_passed` based on strictness
             else:
@@ -228,10 +256,9 @@ def test_job_comparison():
 
         except Exception as e:
             print_failure(f"Comparison test for set {i+1} failed with an unexpected exception: {e}")
-            logger.exception(f"Exception during job comparison test for set {job_list}:")
+            logger.exception("Exception during job comparison test for set %s:", job_list)
             all_passed = False
         print("-" * 30)
-        time.sleep(2) # Be nice to API
     return all_passed
 
 def test_error_handling_invalid_input():
@@ -239,6 +266,9 @@ def test_error_handling_invalid_input():
     if not (DATABASE_URL and BLS_API_KEY): # Basic checks still need these to try API calls
         print_warning("Skipping error handling test: DB_URL or API_KEY missing.")
         return False # Cannot meaningfully test API/DB error paths
+    job_api = _import_app_module("job_api_integration_database_only") # Main interface for data
+    if job_api is None:
+        return False
 
     invalid_job_title = "    " # Empty string / only whitespace
     print_info(f"Testing with invalid job title: '{invalid_job_title}'")
@@ -256,8 +286,9 @@ def test_error_handling_invalid_input():
         all_passed = False
     
     # Test with a very long, likely problematic string
-    long_job_title = "a" * 500
-    print_info(f"Testing with very long job title (500 chars)")
+    # One character over the limit is enough to exercise the length check
+    long_job_title = "a" * (job_api.MAX_JOB_TITLE_LENGTH + 1)
+    print_info(f"Testing with very long job title ({len(long_job_title)} chars)")
     try:
         data = job_api.get_job_data(long_job_title)
         if "error" in data:
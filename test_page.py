@@ -1,8 +1,10 @@
 import streamlit as st
 import os
-import time
+import sys
+import pandas as pd
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 # Configure basic logging for the test page
 logger = logging.getLogger("StreamlitTestPage")
@@ -27,6 +29,16 @@ except ImportError as e:
     logger.critical(critical_error_message)
     # We'll display this error in the Streamlit app itself.
 
+def _resolve_secret(env_name: str, section: str, key: str) -> Optional[str]:
+    """Returns a setting from the environment, else from st.secrets[section][key]; None if it is not set."""
+    value = os.environ.get(env_name)
+    if value:
+        return value
+    try:
+        return st.secrets.get(section, {}).get(key)
+    except Exception: # st.secrets might not be available if not fully initialized
+        return None
+
 # --- Helper Functions for Displaying Test Results ---
 def display_test_header(title: str):
     st.subheader(title)
@@ -36,137 +48,165 @@ def display_result(success: bool, message: str, details: Any = None):
         st.success(f"✅ PASSED: {message}")
     else:
         st.error(f"❌ FAILED: {message}")
-    if details:
+    if isinstance(details, pd.DataFrame): # Tabular results render as a table rather than nested JSON
+        st.dataframe(details, use_container_width=True)
+    elif details:
         if isinstance(details, (dict, list)):
             st.json(details)
         else:
             st.text_area("Details", str(details), height=100, disabled=True)
 
 # --- Test Functions ---
+# Each check_* function does the work and returns (success, message, details) without touching the UI,
+# so "Run All Tests" can run them on worker threads; the matching run_*_test renders the result.
 
-def run_database_connectivity_test():
-    display_test_header("1. Database Connectivity Test")
+TestResult = Tuple[bool, str, Any]
+
+def check_database_connectivity() -> TestResult:
     if not MODULE_IMPORT_SUCCESS or not hasattr(database, 'check_database_health'):
-        display_result(False, "Database module or check_database_health function not available due to import issues.")
-        return
-
-    with st.spinner("Testing database connection..."):
-        time.sleep(1) # Simulate some work
-        try:
-            # Check if DATABASE_URL is accessible (either via os.environ or st.secrets within database.py)
-            db_url = os.environ.get("DATABASE_URL") or st.secrets.get("database", {}).get("DATABASE_URL")
-            if not db_url:
-                display_result(False, "DATABASE_URL secret is not set in Streamlit Cloud.")
-                return
-
-            health_status = database.check_database_health()
-            if health_status.get("status") == "healthy":
-                display_result(True, f"Successfully connected to the database. (Message: {health_status.get('message')})", health_status)
-            else:
-                display_result(False, f"Database health check indicated an issue. (Message: {health_status.get('message')})", health_status)
-        except Exception as e:
-            logger.error(f"Exception during database connectivity test: {e}", exc_info=True)
-            display_result(False, f"An exception occurred: {e}", str(e))
+        return False, "Database module or check_database_health function not available due to import issues.", None
+    try:
+        # Check if DATABASE_URL is accessible (either via os.environ or st.secrets within database.py)
+        db_url = _resolve_secret("DATABASE_URL", "database", "DATABASE_URL")
+        if not db_url:
+            return False, "DATABASE_URL secret is not set in Streamlit Cloud.", None
 
-def run_bls_api_connectivity_test():
-    display_test_header("2. BLS API Key & Connectivity Test")
+        # Probe the module's shared pooled engine, the one the app uses, instead of opening another
+        engine = database.get_db_engine()
+        if engine is None:
+            return False, "Shared database engine is not initialised. Check DATABASE_URL and the database module logs.", None
+        health_status = database.check_database_health(engine) # "OK", "Error" or "Not Configured"
+        if health_status == "OK":
+            return True, "Successfully connected to the database using the shared pooled engine.", health_status
+        else:
+            return False, f"Database health check indicated an issue. (Status: {health_status})", health_status
+    except Exception as e:
+        logger.error("Exception during database connectivity test: %s", e, exc_info=True)
+        return False, f"An exception occurred: {e}", str(e)
+
+def check_bls_api_connectivity() -> TestResult:
     if not MODULE_IMPORT_SUCCESS or not hasattr(bls_connector, 'check_api_connectivity'):
-        display_result(False, "BLS Connector module or check_api_connectivity function not available due to import issues.")
-        return
-
-    with st.spinner("Testing BLS API connection..."):
-        time.sleep(1)
-        try:
-            # Check if BLS_API_KEY is accessible
-            api_key = os.environ.get("BLS_API_KEY") or st.secrets.get("api_keys", {}).get("BLS_API_KEY")
-            if not api_key:
-                display_result(False, "BLS_API_KEY secret is not set in Streamlit Cloud.")
-                return
-
-            is_connected = bls_connector.check_api_connectivity()
-            if is_connected:
-                display_result(True, "BLS API key appears valid and connection was successful.")
-            else:
-                display_result(False, "BLS API connectivity check failed. The API key might be invalid, expired, or the BLS API service might be temporarily unavailable.")
-        except Exception as e:
-            logger.error(f"Exception during BLS API connectivity test: {e}", exc_info=True)
-            display_result(False, f"An exception occurred: {e}", str(e))
+        return False, "BLS Connector module or check_api_connectivity function not available due to import issues.", None
+    try:
+        # Check if BLS_API_KEY is accessible
+        api_key = _resolve_secret("BLS_API_KEY", "api_keys", "BLS_API_KEY")
+        if not api_key:
+            return False, "BLS_API_KEY secret is not set in Streamlit Cloud.", None
 
-def run_single_job_search_test():
-    display_test_header("3. Basic Single Job Search Test")
+        is_connected = bls_connector.check_api_connectivity()
+        if is_connected:
+            return True, "BLS API key appears valid and connection was successful.", None
+        else:
+            return False, "BLS API connectivity check failed. The API key might be invalid, expired, or the BLS API service might be temporarily unavailable.", None
+    except Exception as e:
+        logger.error("Exception during BLS API connectivity test: %s", e, exc_info=True)
+        return False, f"An exception occurred: {e}", str(e)
+
+SAMPLE_JOB_TITLE = "Software Developer" # A common job title expected to be in BLS data
+
+def check_single_job_search() -> TestResult:
     if not MODULE_IMPORT_SUCCESS or not hasattr(job_api, 'get_job_data'):
-        display_result(False, "Job API Integration module or get_job_data function not available due to import issues.")
-        return
-
-    sample_job_title = "Software Developer" # A common job title expected to be in BLS data
-    with st.spinner(f"Performing a search for '{sample_job_title}'..."):
-        time.sleep(1)
-        try:
-            data = job_api.get_job_data(sample_job_title)
+        return False, "Job API Integration module or get_job_data function not available due to import issues.", None
+
+    sample_job_title = SAMPLE_JOB_TITLE
+    try:
+        data = job_api.get_job_data(sample_job_title)
+        if data and "error" not in data and data.get("occupation_code") and data.get("occupation_code") != "00-0000":
+            result_summary = {
+                "Job Title (Standardized)": data.get("job_title"),
+                "Occupation Code": data.get("occupation_code"),
+                "Job Category": data.get("job_category"),
+                "Source": data.get("source"),
+                "5-Year Risk (%)": data.get("year_5_risk"),
+                "Risk Category": data.get("risk_category"),
+                "Median Wage": data.get("median_wage") or data.get("bls_data", {}).get("median_wage"),
+                "Analysis Snippet": data.get("analysis", "")[:150] + "..." if data.get("analysis") else "N/A"
+            }
+            return True, f"Successfully fetched and processed data for '{sample_job_title}'.", result_summary
+        elif data and "error" in data:
+            return False, f"API/DB call for '{sample_job_title}' returned an error.", data["error"]
+        else:
+            return False, f"Received no specific error, but data for '{sample_job_title}' is incomplete, generic (e.g., SOC 00-0000), or missing.", data
+    except Exception as e:
+        logger.error("Exception during single job search test for '%s': %s", sample_job_title, e, exc_info=True)
+        return False, f"An exception occurred: {e}", str(e)
+
+SAMPLE_JOB_LIST = ["Registered Nurse", "Accountant", "Graphic Designer"]
+
+def check_job_comparison() -> TestResult:
+    if not MODULE_IMPORT_SUCCESS or not hasattr(job_api, 'get_jobs_comparison_data'):
+        return False, "Job API Integration module or get_jobs_comparison_data function not available due to import issues.", None
+
+    sample_job_list = SAMPLE_JOB_LIST
+    try:
+        comparison_data = job_api.get_jobs_comparison_data(sample_job_list)
+        if not comparison_data:
+            return False, "Job comparison returned no data at all.", None
+
+        results_summary = []
+        all_successful = True
+        for job_title, data in comparison_data.items():
             if data and "error" not in data and data.get("occupation_code") and data.get("occupation_code") != "00-0000":
-                result_summary = {
-                    "Job Title (Standardized)": data.get("job_title"),
-                    "Occupation Code": data.get("occupation_code"),
-                    "Job Category": data.get("job_category"),
-                    "Source": data.get("source"),
-                    "5-Year Risk (%)": data.get("year_5_risk"),
-                    "Risk Category": data.get("risk_category"),
-                    "Median Wage": data.get("median_wage") or data.get("bls_data", {}).get("median_wage"),
-                    "Analysis Snippet": data.get("analysis", "")[:150] + "..." if data.get("analysis") else "N/A"
-                }
-                display_result(True, f"Successfully fetched and processed data for '{sample_job_title}'.", result_summary)
-            elif data and "error" in data:
-                display_result(False, f"API/DB call for '{sample_job_title}' returned an error.", data["error"])
+                results_summary.append({
+                    "Searched Title": job_title,
+                    "Standardized Title": data.get("job_title"),
+                    "SOC": data.get("occupation_code"),
+                    "5Y Risk (%)": data.get("year_5_risk"),
+                    "Status": "Success"
+                })
             else:
-                display_result(False, f"Received no specific error, but data for '{sample_job_title}' is incomplete, generic (e.g., SOC 00-0000), or missing.", data)
-        except Exception as e:
-            logger.error(f"Exception during single job search test for '{sample_job_title}': {e}", exc_info=True)
-            display_result(False, f"An exception occurred: {e}", str(e))
+                all_successful = False
+                results_summary.append({
+                    "Searched Title": job_title,
+                    "Status": "Failed/Incomplete",
+                    "Error": data.get("error", "Data incomplete or generic")
+                })
+        
+        if all_successful and results_summary:
+            return True, "Successfully fetched and processed data for all jobs in comparison.", pd.DataFrame(results_summary)
+        elif results_summary: # Partial success
+            return False, "Job comparison processed, but some jobs had issues or incomplete data.", pd.DataFrame(results_summary)
+        else: # Should not happen if comparison_data was not empty, but as a safeguard
+            return False, "Job comparison processed, but no valid results were obtained.", comparison_data
+
+    except Exception as e:
+        logger.error("Exception during job comparison test for %s: %s", sample_job_list, e, exc_info=True)
+        return False, f"An exception occurred: {e}", str(e)
+
+def run_database_connectivity_test(result: Optional[TestResult] = None):
+    display_test_header("1. Database Connectivity Test")
+    if result is None:
+        with st.spinner("Testing database connection..."):
+            result = check_database_connectivity()
+    display_result(*result)
+
+def run_bls_api_connectivity_test(result: Optional[TestResult] = None):
+    display_test_header("2. BLS API Key & Connectivity Test")
+    if result is None:
+        with st.spinner("Testing BLS API connection..."):
+            result = check_bls_api_connectivity()
+    display_result(*result)
+
+def run_single_job_search_test(result: Optional[TestResult] = None):
+    display_test_header("3. Basic Single Job Search Test")
+    if result is None:
+        with st.spinner(f"Performing a search for '{SAMPLE_JOB_TITLE}'..."):
+            result = check_single_job_search()
+    display_result(*result)
 
-def run_job_comparison_test():
+def run_job_comparison_test(result: Optional[TestResult] = None):
     display_test_header("4. Basic Job Comparison Test")
-    if not MODULE_IMPORT_SUCCESS or not hasattr(job_api, 'get_jobs_comparison_data'):
-        display_result(False, "Job API Integration module or get_jobs_comparison_data function not available due to import issues.")
-        return
-
-    sample_job_list = ["Registered Nurse", "Accountant", "Graphic Designer"]
-    with st.spinner(f"Performing comparison for jobs: {', '.join(sample_job_list)}..."):
-        time.sleep(1)
-        try:
-            comparison_data = job_api.get_jobs_comparison_data(sample_job_list)
-            if not comparison_data:
-                display_result(False, "Job comparison returned no data at all.")
-                return
-
-            results_summary = []
-            all_successful = True
-            for job_title, data in comparison_data.items():
-                if data and "error" not in data and data.get("occupation_code") and data.get("occupation_code") != "00-0000":
-                    results_summary.append({
-                        "Searched Title": job_title,
-                        "Standardized Title": data.get("job_title"),
-                        "SOC": data.get("occupation_code"),
-                        "5Y Risk (%)": data.get("year_5_risk"),
-                        "Status": "Success"
-                    })
-                else:
-                    all_successful = False
-                    results_summary.append({
-                        "Searched Title": job_title,
-                        "Status": "Failed/Incomplete",
-                        "Error": data.get("error", "Data incomplete or generic")
-                    })
-            
-            if all_successful and results_summary:
-                display_result(True, "Successfully fetched and processed data for all jobs in comparison.", results_summary)
-            elif results_summary: # Partial success
-                display_result(False, "Job comparison processed, but some jobs had issues or incomplete data.", results_summary)
-            else: # Should not happen if comparison_data was not empty, but as a safeguard
-                display_result(False, "Job comparison processed, but no valid results were obtained.", comparison_data)
-
-        except Exception as e:
-            logger.error(f"Exception during job comparison test for {sample_job_list}: {e}", exc_info=True)
-            display_result(False, f"An exception occurred: {e}", str(e))
+    if result is None:
+        with st.spinner(f"Performing comparison for jobs: {', '.join(SAMPLE_JOB_LIST)}..."):
+            result = check_job_comparison()
+    display_result(*result)
+
+def run_all_checks() -> List[TestResult]:
+    """Runs the four independent checks concurrently; their time is mostly database and BLS API I/O."""
+    checks = (check_database_connectivity, check_bls_api_connectivity, check_single_job_search, check_job_comparison)
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = [executor.submit(check) for check in checks]
+    return [future.result() for future in futures]
 
 # --- Streamlit Page UI ---
 st.set_page_config(page_title="App Health & Test Page", layout="wide")
@@ -182,14 +222,16 @@ if not MODULE_IMPORT_SUCCESS:
 else:
     st.sidebar.header("Run Tests")
     if st.sidebar.button("Run All Tests", type="primary", use_container_width=True):
+        with st.spinner("Running all tests..."):
+            db_result, bls_result, search_result, comparison_result = run_all_checks()
         with st.expander("1. Database Connectivity Test Results", expanded=True):
-            run_database_connectivity_test()
+            run_database_connectivity_test(db_result)
         with st.expander("2. BLS API Key & Connectivity Test Results", expanded=True):
-            run_bls_api_connectivity_test()
+            run_bls_api_connectivity_test(bls_result)
         with st.expander("3. Basic Single Job Search Test Results", expanded=True):
-            run_single_job_search_test()
+            run_single_job_search_test(search_result)
         with st.expander("4. Basic Job Comparison Test Results", expanded=True):
-            run_job_comparison_test()
+            run_job_comparison_test(comparison_result)
         st.sidebar.success("All tests initiated!")
 
     st.sidebar.markdown("---")
@@ -210,22 +252,10 @@ else:
     st.header("Current Environment Status (from server perspective)")
     
     # Display secrets status (without revealing actual secrets)
-    db_url_secret = "Not Set"
-    try:
-        if os.environ.get("DATABASE_URL") or st.secrets.get("database", {}).get("DATABASE_URL"):
-            db_url_secret = "Set (found in env or secrets)"
-    except Exception: # st.secrets might not be available if not fully initialized
-        if os.environ.get("DATABASE_URL"):
-             db_url_secret = "Set (found in env)"
+    db_url_secret = "Set (found in env or secrets)" if _resolve_secret("DATABASE_URL", "database", "DATABASE_URL") else "Not Set"
     st.markdown(f"- **DATABASE_URL Secret**: `{db_url_secret}`")
 
-    bls_api_key_secret = "Not Set"
-    try:
-        if os.environ.get("BLS_API_KEY") or st.secrets.get("api_keys", {}).get("BLS_API_KEY"):
-            bls_api_key_secret = "Set (found in env or secrets)"
-    except Exception:
-        if os.environ.get("BLS_API_KEY"):
-            bls_api_key_secret = "Set (found in env)"
+    bls_api_key_secret = "Set (found in env or secrets)" if _resolve_secret("BLS_API_KEY", "api_keys", "BLS_API_KEY") else "Not Set"
     st.markdown(f"- **BLS_API_KEY Secret**: `{bls_api_key_secret}`")
 
     st.markdown(f"- **Python Version**: `{sys.version.split()[0]}`")